@@ -0,0 +1,55 @@
+"""
+Compares the decode time of the installed JSON codecs on synthetic
+`getPictures` and `albumSearchQuery` response payloads
+
+Usage: python benchmarks/codec_benchmark.py [items per page] [repeats]
+"""
+import sys
+import timeit
+from pathlib import Path
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from luscious.codec import JSONCodec, availableCodecs, getCodec
+
+
+def picturesPayload(items: int) -> bytes:
+    """
+    Builds a `getPictures` response with `items` pictures
+    """
+    return JSONCodec().dumps({"data": {"picture": {"list": {
+        "info": {"page": 1, "total_items": items, "total_pages": 1, "items_per_page": items,
+                 "url_complete": "/pictures/album/benchmark_1/sorted/position/page/1/"},
+        "items": [{"url_to_original": f"https://cdnio.luscious.net/benchmark/1/{i:06d}_{'a' * 32}.jpg",
+                   "url_to_video": None,
+                   "url": f"/pictures/album/benchmark_1/id/{i}/"} for i in range(items)]}}}})
+
+
+def searchPayload(items: int) -> bytes:
+    """
+    Builds an `albumSearchQuery` response with `items` albums
+    """
+    return JSONCodec().dumps({"data": {"album": {"list": {
+        "info": {"page": 1, "has_next_page": True, "has_previous_page": False, "total_items": items * 100,
+                 "total_pages": 100, "items_per_page": items, "url_complete": "/albums/list/page/1/"},
+        "items": [{"__typename": "Album", "id": str(i), "title": f"Benchmark album number {i} ❤",
+                   "number_of_pictures": i % 500, "number_of_animated_pictures": i % 7} for i in range(items)]}}}})
+
+
+def main(items: int = 5000, repeats: int = 50):
+    payloads = {"getPictures": picturesPayload(items),
+                "albumSearchQuery": searchPayload(items)}
+    for name, payload in payloads.items():
+        print(f"{name}: {len(payload) / 1024:.0f} KiB")
+        baseline = None
+        for codecName in reversed(availableCodecs()):
+            codec = getCodec(codecName)
+            seconds = min(timeit.repeat(lambda: codec.loads(payload),
+                                        number=repeats, repeat=5)) / repeats
+            baseline = baseline or seconds
+            print(f"    {codecName:>6}: {seconds * 1000:8.3f} ms/decode ({baseline / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
@@ -1,2 +1,10 @@
 from .luscious import *
+from .crawler import (CrawlCheckpoint, Crawler, Shard, crawlWorker, planIdRange,
+                      planSearch)
+from .export import (NDJSONWriter, ParquetWriter, albumsById, exportItems,
+                     flatten, videosById)
+from .profiling import NULL_PROFILER, NullProfiler, Profiler, Span
+from .storage import LocalStorage, MemoryStorage, S3Storage, Storage
+from .transport import Cassette, CassetteMiss, RecordingAdapter, ReplayAdapter
+from .writer import DiskWriter, PendingFile
 __version__ = "1.1.4"
\ No newline at end of file
@@ -0,0 +1,95 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class JSONCodec():
+    """
+    JSON codec backed by the standard library
+    Used to decode API responses and encode query variables
+    """
+    name = "json"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Decodes a json document
+        """
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        """
+        Encodes `obj` as compact json and returns it as `utf-8` bytes
+        """
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    JSON codec backed by `orjson`
+    """
+    name = "orjson"
+
+    def __init__(self):
+        if(orjson is None):
+            raise ImportError("orjson is not installed")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+
+class UjsonCodec(JSONCodec):
+    """
+    JSON codec backed by `ujson`
+    """
+    name = "ujson"
+
+    def __init__(self):
+        if(ujson is None):
+            raise ImportError("ujson is not installed")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return ujson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return ujson.dumps(obj).encode("utf-8")
+
+
+CODECS = {codec.name: codec for codec in (
+    OrjsonCodec, UjsonCodec, JSONCodec)}
+
+
+def availableCodecs() -> list:
+    """
+    Returns the names of the codecs that can be used, fastest first
+    """
+    return [name for name, module in (("orjson", orjson), ("ujson", ujson), ("json", json)) if module is not None]
+
+
+def getCodec(codec: Union[str, JSONCodec] = None) -> JSONCodec:
+    """
+    Returns a codec object
+
+    `codec` can either be a codec object, which is returned as is,
+    the name of a codec ("orjson", "ujson" or "json"),
+    or None to use the fastest installed codec
+    """
+    if(isinstance(codec, JSONCodec)):
+        return codec
+    if(codec is None):
+        codec = availableCodecs()[0]
+    try:
+        return CODECS[codec]()
+    except KeyError:
+        raise ValueError(f"Unknown codec {codec!r}") from None
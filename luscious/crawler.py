@@ -0,0 +1,283 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, List, Union
+
+try:
+    from .luscious import (Luscious, NotFound, albumTypeOptions,
+                           contentTypeOptions)
+except ImportError:
+    from luscious import (Luscious, NotFound, albumTypeOptions,
+                          contentTypeOptions)
+
+SHARD_KINDS = ("albumIds", "videoIds", "albumSearch", "videoSearch")
+
+
+class LeaseLost(Exception):
+    pass
+
+
+@dataclass
+class Shard():
+    """
+    A part of a crawl
+
+    `kind` is one of "albumIds", "videoIds" (ids `start` to `stop` - 1)
+    or "albumSearch", "videoSearch" (search pages `start` to `stop` - 1 of the search in `params`)
+    `position` is the next id or page to crawl
+    """
+    id: str
+    kind: str
+    start: int
+    stop: int
+    params: dict = field(default_factory=dict)
+    position: int = None
+    status: str = "pending"
+    attempts: int = 0
+
+    def __post_init__(self):
+        if(self.kind not in SHARD_KINDS):
+            raise ValueError(f"Unknown shard kind {self.kind!r}")
+        if(self.position is None):
+            self.position = self.start
+
+    @property
+    def done(self) -> bool:
+        """
+        Returns True if every id or page of the shard was crawled
+        """
+        return self.position >= self.stop
+
+
+def planIdRange(start: int, stop: int, shardSize: int = 1000, kind: str = "albumIds") -> List[Shard]:
+    """
+    Splits the ids `start` to `stop` - 1 into shards of `shardSize` ids
+    `kind` is either "albumIds" or "videoIds"
+    """
+    return [Shard(f"{kind}:{i}-{min(i + shardSize, stop)}", kind, i, min(i + shardSize, stop))
+            for i in range(start, stop, shardSize)]
+
+
+def planSearch(query: str, pages: int, pagesPerShard: int = 10, kind: str = "albumSearch", display: str = "rating_all_time", albumType: albumTypeOptions = albumTypeOptions.All, contentType: contentTypeOptions = contentTypeOptions.All) -> List[Shard]:
+    """
+    Splits the first `pages` pages of a search into shards of `pagesPerShard` pages
+    `kind` is either "albumSearch" or "videoSearch", the other arguments are the ones of `Luscious.searchAlbum`
+    """
+    params = {"query": query, "display": display,
+              "contentType": contentType.value}
+    if(kind == "albumSearch"):
+        params["albumType"] = albumType.value
+    return [Shard(f"{kind}:{query}:{display}:{i}-{min(i + pagesPerShard, pages + 1)}", kind, i, min(i + pagesPerShard, pages + 1), params)
+            for i in range(1, pages + 1, pagesPerShard)]
+
+
+class CrawlCheckpoint():
+    """
+    A SQLite file recording the shards of a crawl and how far each one got
+
+    Workers claim shards with a lease, a shard whose owner stopped renewing it for `lease` seconds
+    can be claimed by another worker and is resumed from its last recorded position.
+    Put the file on a shared filesystem to crawl from several machines
+    """
+
+    def __init__(self, path: Union[Path, str], lease: float = 300, timeout: float = 60):
+        self.path = Path(path)
+        self.lease = lease
+        self.__connection = sqlite3.connect(
+            str(self.path), timeout=timeout, isolation_level=None)
+        self.__connection.execute("""CREATE TABLE IF NOT EXISTS shards (
+            id TEXT PRIMARY KEY, kind TEXT, start INTEGER, stop INTEGER, params TEXT,
+            position INTEGER, status TEXT, attempts INTEGER DEFAULT 0,
+            owner TEXT, heartbeat REAL, error TEXT)""")
+
+    def close(self):
+        """
+        Closes the connection to the checkpoint file
+        """
+        self.__connection.close()
+
+    def addShards(self, shards: Iterable[Shard]) -> int:
+        """
+        Adds shards to the crawl, shards that already exist keep their progress
+        Returns the number of added shards
+        """
+        with self.__connection:
+            self.__connection.execute("BEGIN IMMEDIATE")
+            cursor = self.__connection.executemany("INSERT OR IGNORE INTO shards (id, kind, start, stop, params, position, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                                   [(s.id, s.kind, s.start, s.stop, json.dumps(s.params), s.position, s.status) for s in shards])
+        return cursor.rowcount
+
+    def claim(self, owner: str) -> Shard:
+        """
+        Claims the next pending shard, or a running one whose lease expired, for `owner`
+        Returns None when there is nothing left to claim
+        """
+        now = time.time()
+        with self.__connection:
+            self.__connection.execute("BEGIN IMMEDIATE")
+            row = self.__connection.execute("SELECT id, kind, start, stop, params, position, attempts FROM shards WHERE status = 'pending' OR (status = 'running' AND heartbeat < ?) ORDER BY attempts, id LIMIT 1",
+                                            (now - self.lease,)).fetchone()
+            if(row is None):
+                return None
+            self.__connection.execute("UPDATE shards SET status = 'running', owner = ?, heartbeat = ? WHERE id = ?",
+                                      (owner, now, row[0]))
+        return Shard(row[0], row[1], row[2], row[3], json.loads(row[4]), row[5], "running", row[6])
+
+    def advance(self, shard: Shard, owner: str):
+        """
+        Records the shard's position and renews the owner's lease
+        Raises `LeaseLost` if another worker took the shard over
+        """
+        with self.__connection:
+            cursor = self.__connection.execute("UPDATE shards SET position = ?, heartbeat = ? WHERE id = ? AND owner = ? AND status = 'running'",
+                                               (shard.position, time.time(), shard.id, owner))
+        if(cursor.rowcount == 0):
+            raise LeaseLost(shard.id)
+
+    def complete(self, shard: Shard, owner: str):
+        """
+        Marks the shard as done
+        """
+        with self.__connection:
+            self.__connection.execute("UPDATE shards SET position = ?, status = 'done', heartbeat = ? WHERE id = ? AND owner = ?",
+                                      (shard.position, time.time(), shard.id, owner))
+
+    def release(self, shard: Shard, owner: str, error: str = None, maxAttempts: int = 3):
+        """
+        Gives the shard back after a failure so it is resumed later
+        The shard is marked as failed once it failed `maxAttempts` times
+        """
+        with self.__connection:
+            self.__connection.execute("UPDATE shards SET position = ?, attempts = attempts + 1, error = ?, owner = NULL, status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END WHERE id = ? AND owner = ?",
+                                      (shard.position, error, maxAttempts, shard.id, owner))
+
+    def progress(self) -> dict:
+        """
+        Returns a dict with the number of shards per status and the number of crawled and total ids or pages
+        """
+        result = {"pending": 0, "running": 0, "done": 0, "failed": 0}
+        for status, count in self.__connection.execute("SELECT status, COUNT(*) FROM shards GROUP BY status"):
+            result[status] = count
+        crawled, total = self.__connection.execute(
+            "SELECT COALESCE(SUM(position - start), 0), COALESCE(SUM(stop - start), 0) FROM shards").fetchone()
+        result["crawled"] = crawled
+        result["total"] = total
+        return result
+
+
+def crawlShard(lus: Luscious, shard: Shard, handle: Callable, checkpoint: CrawlCheckpoint, owner: str, fields=None):
+    """
+    Crawls a claimed shard from its position, passing every found `Album` or `Video` to `handle`
+    The position is recorded after every handled id or page, ids the API reports as missing are skipped
+    while request errors are raised so the shard is released and retried from its position
+    """
+    if(shard.kind in ("albumIds", "videoIds")):
+        getter = lus.getAlbum if shard.kind == "albumIds" else lus.getVideo
+        while(not shard.done):
+            try:
+                item = getter(shard.position, fields=fields)
+            except NotFound:
+                item = None
+            if(item is not None):
+                handle(item)
+            shard.position += 1
+            checkpoint.advance(shard, owner)
+    else:
+        params = dict(shard.params)
+        params["contentType"] = contentTypeOptions(params["contentType"])
+        if(shard.kind == "albumSearch"):
+            params["albumType"] = albumTypeOptions(params["albumType"])
+            search = lus.searchAlbum
+        else:
+            search = lus.searchVideo
+        query = params.pop("query")
+        while(not shard.done):
+            result = search(query, page=shard.position,
+                            fields=fields, **params)
+            for item in result["items"]:
+                handle(item)
+            shard.position += 1
+            if(not result["info"]["has_next_page"]):
+                shard.position = shard.stop
+            checkpoint.advance(shard, owner)
+    checkpoint.complete(shard, owner)
+
+
+def crawlWorker(checkpointPath: Union[Path, str], handle: Callable, lusciousOptions: dict = None, fields=None, lease: float = 300, maxAttempts: int = 3) -> int:
+    """
+    Claims and crawls shards of the checkpoint until none is left
+    Run it on every process or machine taking part in the crawl, `handle` and `lusciousOptions` must be picklable
+    `lusciousOptions` are the keyword arguments of the `Luscious` object used by the worker
+    Returns the number of shards crawled by this worker
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    checkpoint = CrawlCheckpoint(checkpointPath, lease)
+    lus = Luscious(**(lusciousOptions or {}))
+    crawled = 0
+    try:
+        while(True):
+            shard = checkpoint.claim(owner)
+            if(shard is None):
+                return crawled
+            try:
+                crawlShard(lus, shard, handle, checkpoint, owner, fields)
+                crawled += 1
+            except LeaseLost:
+                continue
+            except Exception as e:
+                checkpoint.release(shard, owner, repr(e), maxAttempts)
+    finally:
+        checkpoint.close()
+
+
+class Crawler():
+    """
+    Crawls albums or videos by id ranges or search pages on a process pool
+
+    The progress of every shard is recorded in a `CrawlCheckpoint` so a stopped crawl resumes where it stopped.
+    Crawlers on several machines can share the same checkpoint file
+    """
+
+    def __init__(self, checkpointPath: Union[Path, str], handle: Callable, workers: int = None, lusciousOptions: dict = None, fields=None, lease: float = 300, maxAttempts: int = 3):
+        """
+        `handle` is called with every found `Album` or `Video` (or id for searches without `fields`),
+        it runs in the worker processes and must be a picklable, module level function
+        `workers` is the number of worker processes, defaults to the number of CPUs
+        `lusciousOptions` are the keyword arguments of the `Luscious` object of each worker
+        `fields` is the field selection passed to `Luscious.getAlbum`, `Luscious.searchAlbum` and their video counterparts
+        """
+        self.checkpoint = CrawlCheckpoint(checkpointPath, lease)
+        self.handle = handle
+        self.workers = workers or os.cpu_count()
+        self.lusciousOptions = lusciousOptions
+        self.fields = fields
+        self.maxAttempts = maxAttempts
+
+    def addShards(self, shards: Iterable[Shard]) -> int:
+        """
+        Adds shards to the crawl, see `planIdRange` and `planSearch`
+        """
+        return self.checkpoint.addShards(shards)
+
+    def run(self) -> dict:
+        """
+        Crawls every remaining shard with `workers` processes
+        Returns the progress of the crawl once no shard is left to claim
+        """
+        with ProcessPoolExecutor(self.workers) as executor:
+            futures = [executor.submit(crawlWorker, self.checkpoint.path, self.handle, self.lusciousOptions,
+                                       self.fields, self.checkpoint.lease, self.maxAttempts) for _ in range(self.workers)]
+            for future in futures:
+                future.result()
+        return self.progress()
+
+    def progress(self) -> dict:
+        """
+        Returns the progress of the crawl, see `CrawlCheckpoint.progress`
+        """
+        return self.checkpoint.progress()
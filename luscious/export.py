@@ -0,0 +1,210 @@
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Union
+
+try:
+    from .codec import getCodec
+    from .luscious import Album, Luscious, NotFound, Tag, Video
+except ImportError:
+    from codec import getCodec
+    from luscious import Album, Luscious, NotFound, Tag, Video
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Tag categories that get their own column, the other tags go to `otherTags`
+TAG_COLUMNS = {"Artist": "artists",
+               "Character": "characters", "Parody": "parodies"}
+
+# fields read by `flattenAlbum` and `flattenVideo`, fetched in one request when some are missing
+ALBUM_ROW_FIELDS = ("title", "url", "download_url", "cover", "number_of_pictures", "number_of_animated_pictures",
+                    "is_manga", "content", "genres", "tags")
+VIDEO_ROW_FIELDS = ("title", "url", "poster_url",
+                    "content", "genres", "tags")
+
+COLUMNS = ("id", "kind", "title", "url", "downloadUrl", "thumbnail", "pictureCount", "animatedCount", "isManga",
+           "contentType", "genres", "artists", "characters", "parodies", "otherTags", "contentUrls")
+
+
+def tagsByCategory(tags: Iterable[Tag]) -> dict:
+    """
+    Returns the tag names split into the `TAG_COLUMNS` columns and `otherTags`
+    """
+    columns = {column: [] for column in TAG_COLUMNS.values()}
+    columns["otherTags"] = []
+    for tag in tags:
+        columns[TAG_COLUMNS.get(tag.category, "otherTags")].append(tag.name)
+    return columns
+
+
+def flattenAlbum(album: Album, includeContentUrls: bool = False) -> dict:
+    """
+    Returns a flat row of an `Album` with the columns of `COLUMNS`
+    `contentUrls` is only filled with `includeContentUrls` as it needs one request per page of pictures
+    The fields missing from the album are fetched in a single request
+    """
+    album.fetchFields(ALBUM_ROW_FIELDS)
+    row = {"id": album.id, "kind": "album", "title": album.name, "url": album.url, "downloadUrl": album.downloadUrl,
+           "thumbnail": album.thumbnail, "pictureCount": album.pictureCount, "animatedCount": album.animatedCount,
+           "isManga": album.isManga, "contentType": album.contentType, "genres": [genre.name for genre in album.genres]}
+    row.update(tagsByCategory(album.tags))
+    row["contentUrls"] = album.contentUrls if includeContentUrls else None
+    return row
+
+
+def flattenVideo(video: Video, includeContentUrls: bool = False) -> dict:
+    """
+    Returns a flat row of a `Video` with the columns of `COLUMNS`
+    The fields missing from the video (and its quality urls with `includeContentUrls`) are fetched in a single request
+    """
+    video.fetchFields(VIDEO_ROW_FIELDS + (("v240p", "v360p", "v720p", "v1080p")
+                                          if includeContentUrls else ()))
+    row = {"id": video.id, "kind": "video", "title": video.name, "url": video.url, "downloadUrl": None,
+           "thumbnail": video.thumbnail, "pictureCount": None, "animatedCount": None, "isManga": None,
+           "contentType": video.contentType, "genres": [genre.name for genre in video.genres]}
+    row.update(tagsByCategory(video.tags))
+    row["contentUrls"] = [url for url in video.contentUrls if url] if includeContentUrls else None
+    return row
+
+
+def flatten(item: Union[Album, Video], includeContentUrls: bool = False) -> dict:
+    """
+    Returns the flat row of an `Album` or a `Video`
+    Raises `TypeError` for anything else, such as the ids yielded by the search iterators without `fields`
+    """
+    if(isinstance(item, Album)):
+        return flattenAlbum(item, includeContentUrls)
+    if(isinstance(item, Video)):
+        return flattenVideo(item, includeContentUrls)
+    raise TypeError(
+        f"expected an Album or a Video, got {type(item).__name__}, pass `fields` to the search iterators")
+
+
+def albumsById(lus: Luscious, ids: Iterable[int], fields=None) -> Iterator[Album]:
+    """
+    Yields the albums of `ids` one by one, skipping the ones that don't exist
+    """
+    for i in ids:
+        try:
+            yield lus.getAlbum(i, fields=fields)
+        except NotFound:
+            continue
+
+
+def videosById(lus: Luscious, ids: Iterable[int], fields=None) -> Iterator[Video]:
+    """
+    Yields the videos of `ids` one by one, skipping the ones that don't exist
+    """
+    for i in ids:
+        try:
+            yield lus.getVideo(i, fields=fields)
+        except NotFound:
+            continue
+
+
+class NDJSONWriter():
+    """
+    Writes rows as newline delimited json, one line per row
+    `output` is either a path or a binary file object
+    """
+
+    def __init__(self, output: Union[Path, str, BinaryIO], codec=None):
+        self.__ownFile = isinstance(output, (Path, str))
+        self.file = open(output, "wb") if self.__ownFile else output
+        self.codec = getCodec(codec)
+        self.rows = 0
+
+    def write(self, row: dict):
+        """
+        Writes a row
+        """
+        self.file.write(self.codec.dumps(row) + b"\n")
+        self.rows += 1
+
+    def close(self):
+        """
+        Flushes the rows and closes the file if the writer opened it
+        """
+        self.file.flush()
+        if(self.__ownFile):
+            self.file.close()
+
+    def __enter__(self) -> "NDJSONWriter":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ParquetWriter():
+    """
+    Writes rows to a Parquet file in row groups of `rowGroupSize` rows, only one row group is held in memory
+    Requires `pyarrow`
+    """
+
+    def __init__(self, output: Union[Path, str], rowGroupSize: int = 10000, compression: str = "zstd"):
+        if(pyarrow is None):
+            raise ImportError("pyarrow is required to export to Parquet")
+        strings = pyarrow.list_(pyarrow.string())
+        self.schema = pyarrow.schema([("id", pyarrow.int64()), ("kind", pyarrow.string()), ("title", pyarrow.string()),
+                                      ("url", pyarrow.string()), ("downloadUrl",
+                                                                  pyarrow.string()),
+                                      ("thumbnail", pyarrow.string()), ("pictureCount",
+                                                                        pyarrow.int32()),
+                                      ("animatedCount", pyarrow.int32()), ("isManga",
+                                                                           pyarrow.bool_()),
+                                      ("contentType", pyarrow.string()), ("genres", strings), (
+                                          "artists", strings),
+                                      ("characters", strings), ("parodies", strings), ("otherTags", strings), ("contentUrls", strings)])
+        self.rowGroupSize = rowGroupSize
+        self.rows = 0
+        self.__buffer: List[dict] = []
+        self.__writer = pyarrow.parquet.ParquetWriter(
+            str(output), self.schema, compression=compression)
+
+    def write(self, row: dict):
+        """
+        Buffers a row, the buffer is written as a row group once it holds `rowGroupSize` rows
+        """
+        self.__buffer.append(row)
+        self.rows += 1
+        if(len(self.__buffer) >= self.rowGroupSize):
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered rows as a row group
+        """
+        if(self.__buffer):
+            self.__writer.write_table(pyarrow.Table.from_pylist(
+                self.__buffer, schema=self.schema))
+            self.__buffer.clear()
+
+    def close(self):
+        """
+        Writes the remaining rows and closes the file
+        """
+        self.flush()
+        self.__writer.close()
+
+    def __enter__(self) -> "ParquetWriter":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def exportItems(items: Iterable[Union[Album, Video]], writer: Union[NDJSONWriter, ParquetWriter], includeContentUrls: bool = False) -> int:
+    """
+    Flattens every `Album` or `Video` of `items` and writes it with `writer` as soon as it is produced
+    Feed it a generator such as `albumsById` or `Luscious.iterSearchAlbum` with `fields` set to keep the memory use bounded,
+    `fields="standard"` fetches every column but `contentUrls` with the item itself
+    Returns the number of written rows
+    """
+    rows = 0
+    for item in items:
+        writer.write(flatten(item, includeContentUrls))
+        rows += 1
+    return rows
@@ -1,11 +1,18 @@
 import mimetypes
+import threading
 import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future
+from concurrent.futures import wait as futureWait
 from dataclasses import dataclass
 from enum import Enum
-from functools import cached_property
+from functools import cached_property, lru_cache
 from pathlib import Path
 from random import sample
-from typing import List, Tuple, Union
+from typing import (Callable, ClassVar, Dict, FrozenSet, Iterable, Iterator,
+                    List, Sequence, Tuple, Union)
 from urllib.parse import urljoin, urlparse
 from urllib.request import getproxies
 
@@ -15,13 +22,32 @@ from pathvalidate import sanitize_filepath
 from requests import Session
 from requests.adapters import HTTPAdapter
 from requests.models import Response
-from tqdm import trange, tqdm
 from urllib3.util.retry import Retry
 
 try:
     from queries import *
+    from codec import JSONCodec, getCodec
+    from pipeline import MediaPipeline
+    from profiling import NULL_PROFILER, Profiler
+    from progress import (SILENT, AggregateProgress, CallbackReporter,
+                          DownloadEvent, ProgressReporter, SilentReporter,
+                          eventTypes)
+    from scheduler import DownloadJob, DownloadScheduler, priorityOptions
+    from session import SessionStore
+    from storage import LocalStorage, Storage
+    from writer import DiskWriter
 except:
     from .queries import *  # pylint: disable=unused-wildcard-import
+    from .codec import JSONCodec, getCodec
+    from .pipeline import MediaPipeline
+    from .profiling import NULL_PROFILER, Profiler
+    from .progress import (SILENT, AggregateProgress, CallbackReporter,
+                           DownloadEvent, ProgressReporter, SilentReporter,
+                           eventTypes)
+    from .scheduler import DownloadJob, DownloadScheduler, priorityOptions
+    from .session import SessionStore
+    from .storage import LocalStorage, Storage
+    from .writer import DiskWriter
 
 
 class NotFound(Exception):
@@ -51,6 +77,14 @@ class contentTypeOptions(Enum):
     RealPeople = 6
 
 
+@lru_cache(maxsize=1 << 14)
+def sanitizePath(path: Union[Path, str]) -> Union[Path, str]:
+    """
+    `sanitize_filepath` with its results cached, album names and download roots are sanitized many times
+    """
+    return sanitize_filepath(path)
+
+
 class RequestHandler(object):
     """
     Defines a synchronous request handler class that provides methods and
@@ -62,17 +96,47 @@ class RequestHandler(object):
     _status_forcelist = [413, 429, 500, 502, 503, 504]
     _backoff_factor = 1
     _fake = Faker()
+    _jsonHeaders = {"Content-Type": "application/json"}
 
     def __init__(self,
                  timeout: Tuple[float, float] = _timeout,
                  total: int = _total,
                  status_forcelist: List[int] = _status_forcelist.copy(),
-                 backoff_factor: int = _backoff_factor):
-        """Instantiates a new request handler object."""
+                 backoff_factor: int = _backoff_factor,
+                 persistedQueries: bool = False,
+                 codec: Union[str, JSONCodec] = None,
+                 scheduler: DownloadScheduler = None,
+                 coalesce: bool = True):
+        """
+        Instantiates a new request handler object.
+
+        With `persistedQueries` GraphQL queries are first sent as a persisted query hash,
+        falling back to the full document when the server does not recognize it.
+
+        `codec` is the JSON codec used for API requests and responses, either a codec
+        object or the name of one ("orjson", "ujson", "json"). Defaults to the fastest
+        one installed.
+
+        `scheduler` is an optional `DownloadScheduler` that throttles the content
+        streamed by `download`. Share one between handlers for a global budget.
+
+        With `coalesce` identical non-streamed GET and POST requests made at the same
+        time from several threads share a single request and its response.
+        """
         self.timeout = timeout
         self.total = total
         self.status_forcelist = status_forcelist
         self.backoff_factor = backoff_factor
+        self.persistedQueries = persistedQueries
+        self.codec = getCodec(codec)
+        self.scheduler = scheduler
+        self.coalesce = coalesce
+        # Called without arguments when the API rejects a request because the session
+        # is not logged in, the request is sent again once it returns
+        self.onAuthFailure = None
+        self.__unknownQueries = set()
+        self.__inflight = {}
+        self.__inflightLock = threading.Lock()
 
     @cached_property
     def retry_strategy(self) -> Retry:
@@ -109,60 +173,179 @@ class RequestHandler(object):
         """
         Returns the GET request encoded in `utf-8`. Adds proxies to this session
         on the fly if urllib is able to pick up the system's proxy settings.
+        Identical concurrent requests are coalesced, see `coalesce`.
         """
-        response = self.session.get(
-            url, timeout=self.timeout, params=params, proxies=getproxies(), **kwargs)
-        response.encoding = 'utf-8'
-        return response
+        return self.__singleFlight("GET", url, params, kwargs, self.session.get)
 
     def post(self, url: str, params: dict = None, **kwargs) -> Response:
         """
         Returns the POST request encoded in `utf-8`. Adds proxies to this session
         on the fly if urllib is able to pick up the system's proxy settings.
+        Identical concurrent requests are coalesced, see `coalesce`.
         """
-        response = self.session.post(
-            url, timeout=self.timeout, params=params, proxies=getproxies(), **kwargs)
-        response.encoding = 'utf-8'
-        return response
+        return self.__singleFlight("POST", url, params, kwargs, self.session.post)
 
-
-@dataclass
+    def __requestKey(self, method: str, url: str, params: dict, kwargs: dict) -> tuple:
+        """
+        Returns a hashable key identifying the request, None if it can't be coalesced
+        """
+        if(not self.coalesce or kwargs.get("stream") or not set(kwargs) <= {"data", "json", "headers"}):
+            return None
+        try:
+            key = (method, url,
+                   tuple(sorted(params.items())) if params else None,
+                   kwargs.get("data") if not isinstance(
+                       kwargs.get("data"), dict) else tuple(sorted(kwargs["data"].items())),
+                   self.codec.dumps(kwargs["json"]) if "json" in kwargs else None,
+                   tuple(sorted(kwargs["headers"].items())) if kwargs.get("headers") else None)
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def __singleFlight(self, method: str, url: str, params: dict, kwargs: dict, send) -> Response:
+        """
+        Sends the request, or waits for the identical request that is already in flight and returns its response
+        """
+        key = self.__requestKey(method, url, params, kwargs)
+        if(key is None):
+            response = send(url, timeout=self.timeout, params=params,
+                            proxies=getproxies(), **kwargs)
+            response.encoding = 'utf-8'
+            return response
+        with self.__inflightLock:
+            future = self.__inflight.get(key)
+            leader = future is None
+            if(leader):
+                future = self.__inflight[key] = Future()
+        if(not leader):
+            return future.result()
+        try:
+            response = send(url, timeout=self.timeout, params=params,
+                            proxies=getproxies(), **kwargs)
+            response.encoding = 'utf-8'
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.__inflightLock:
+                del self.__inflight[key]
+
+    def download(self, url: str, priority: priorityOptions = None, job: DownloadJob = None, chunkSize: int = 1 << 16) -> Tuple[Response, Iterator[bytes]]:
+        """
+        Returns the streamed GET response of `url` and an iterator over its
+        content. With a `scheduler` the content is throttled as part of `job`,
+        or of a new job, at `priority` (defaults to the job's priority).
+        """
+        response = self.get(url, stream=True)
+        chunks = response.iter_content(chunkSize)
+        if(self.scheduler):
+            if(job is None):
+                job = self.scheduler.job(
+                    priorityOptions.Normal if priority is None else priority)
+            chunks = job.throttle(chunks, priority)
+        return response, chunks
+
+    def graphql(self, url: str, query: dict) -> dict:
+        """
+        POSTs a query dict from `queries` and returns the json response decoded
+        with the handler's codec. The body is serialized with `serializeQuery` so
+        the document is only serialized once. When `persistedQueries` is set only the document's hash is
+        sent, if the server does not know the hash the document is sent with it so the server registers it.
+        The hash is not sent anymore for documents the server answered PERSISTED_QUERY_NOT_SUPPORTED to.
+        If the request fails because the session is not logged in and `onAuthFailure`
+        is set, it is called and the request is sent once more.
+        """
+        try:
+            json = self.__graphql(url, query)
+            if(not (self.onAuthFailure and isAuthFailure(json))):
+                return json
+        except requests.HTTPError as e:
+            if(not self.onAuthFailure or e.response is None or e.response.status_code not in (401, 403)):
+                raise
+        self.onAuthFailure()
+        return self.__graphql(url, query)
+
+    def __graphql(self, url: str, query: dict) -> dict:
+        if(self.persistedQueries and query["query"] not in self.__unknownQueries):
+            try:
+                json = self.codec.loads(self.post(url, data=serializeQuery(
+                    query, True, self.codec.dumps), headers=self._jsonHeaders).content)
+                if(not isPersistedQueryNotFound(json)):
+                    return json
+            except requests.HTTPError:
+                json = {}
+            if(not isPersistedQueryNotSupported(json)):
+                # send the document with its hash so the server registers it for the next requests
+                json = self.codec.loads(self.post(url, data=serializeQuery(
+                    query, True, self.codec.dumps, register=True), headers=self._jsonHeaders).content)
+                if(not isPersistedQueryNotSupported(json)):
+                    return json
+            self.__unknownQueries.add(query["query"])
+        return self.codec.loads(self.post(url, data=serializeQuery(
+            query, False, self.codec.dumps), headers=self._jsonHeaders).content)
+
+
+_ONGOING_TAG_ID = "1895669"
+
+
+@dataclass(frozen=True)
 class Tag():
     """
     A Tag class used to help with tags
+
+    Tags are immutable and use `__slots__`, the derived names are computed once on creation.
+    Use `Tag.intern` or `Tag.fromJson` to share a single instance per tag id
     """
+    __slots__ = ("id", "text", "category", "url",
+                 "name", "sanitizedName", "hashtag")
+    _registry: ClassVar[Dict[str, "Tag"]] = {}
+
     id: str
     text: str
     category: str
     url: str
 
-    @cached_property
-    def name(self):
-        """
-        Returns the name of the comic without the category
-        """
-        return self.text.split(":")[-1].strip().title()
+    def __post_init__(self):
+        # name: the name of the tag without the category
+        # sanitizedName: the sanitized name of the tag
+        # hashtag: the tag name in hashtag format "#Tag_Name"
+        name = self.text.split(":")[-1].strip().title()
+        sanitizedName = sanitize_filepath(name)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "sanitizedName", sanitizedName)
+        object.__setattr__(self, "hashtag",
+                           f"#{sanitizedName.replace(' ','_').replace('-','_')}")
 
-    @cached_property
-    def fullName(self):
+    def __reduce__(self):
+        return (self.__class__.intern, (self.id, self.text, self.category, self.url))
+
+    @classmethod
+    def intern(cls, id: str, text: str, category: str, url: str) -> "Tag":
         """
-        returns the full name of the in the format "category: name"
+        Returns the shared `Tag` instance for the given id, creating it if needed
         """
-        return self.text
+        tag = cls._registry.get(id)
+        if(tag is None or tag.text != text or tag.category != category or tag.url != url):
+            tag = cls(id, text, category, url)
+            cls._registry[id] = tag
+        return tag
 
-    @cached_property
-    def sanitizedName(self):
+    @classmethod
+    def fromJson(cls, json: dict) -> "Tag":
         """
-        Returns the sanitized name of the tag
+        Returns the shared `Tag` instance for a tag json dict with fields "id", "text", "category", "url"
         """
-        return sanitize_filepath(self.name)
+        return cls.intern(json["id"], json["text"], json["category"], json["url"])
 
-    @cached_property
-    def hashtag(self):
+    @property
+    def fullName(self):
         """
-        Returns the tag name in hashtag format "#Tag_Name"
+        returns the full name of the in the format "category: name"
         """
-        return f"#{self.sanitizedName.replace(' ','_').replace('-','_')}"
+        return self.text
 
     def __str__(self):
         """
@@ -171,56 +354,101 @@ class Tag():
         return self.name
 
 
-@dataclass
+@dataclass(frozen=True)
 class Genre():
     """
-    A Tag class used to help with tags
+    A Genre class used to help with genres
+
+    Genres are immutable and use `__slots__`, the derived names are computed once on creation.
+    Use `Genre.intern` or `Genre.fromJson` to share a single instance per genre id
     """
+    __slots__ = ("id", "title", "url", "name", "sanitizedName", "hashtag")
+    _registry: ClassVar[Dict[str, "Genre"]] = {}
+
     id: str
     title: str
     url: str
 
-    @cached_property
-    def name(self):
-        """
-        Returns the name of the comic without the category
-        """
-        return self.text.split(":")[-1].strip().title()
+    def __post_init__(self):
+        # name: the name of the genre
+        # sanitizedName: the sanitized name of the genre
+        # hashtag: the genre name in hashtag format "#Genre_Name"
+        name = self.title.split(":")[-1].strip().title()
+        sanitizedName = sanitize_filepath(name)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "sanitizedName", sanitizedName)
+        object.__setattr__(self, "hashtag",
+                           f"#{sanitizedName.replace(' ','_').replace('-','_')}")
 
-    @cached_property
-    def fullName(self):
+    def __reduce__(self):
+        return (self.__class__.intern, (self.id, self.title, self.url))
+
+    @classmethod
+    def intern(cls, id: str, title: str, url: str) -> "Genre":
         """
-        returns the full name of the in the format "category: name"
+        Returns the shared `Genre` instance for the given id, creating it if needed
         """
-        return self.text
+        genre = cls._registry.get(id)
+        if(genre is None or genre.title != title or genre.url != url):
+            genre = cls(id, title, url)
+            cls._registry[id] = genre
+        return genre
 
-    @cached_property
-    def sanitizedName(self):
+    @classmethod
+    def fromJson(cls, json: dict) -> "Genre":
         """
-        Returns the sanitized name of the tag
+        Returns the shared `Genre` instance for a genre json dict with fields "id", "title", "url"
         """
-        return sanitize_filepath(self.name)
+        return cls.intern(json["id"], json["title"], json["url"])
 
-    @cached_property
-    def hashtag(self):
+    @property
+    def fullName(self):
         """
-        Returns the tag name in hashtag format "#Tag_Name"
+        returns the full title of the genre
         """
-        return f"#{self.sanitizedName.replace(' ','_').replace('-','_')}"
+        return self.title
 
     def __str__(self):
         """
-        Returns the tag name
+        Returns the genre name
         """
         return self.name
 
 
+@dataclass
+class PlannedPage():
+    """
+    A page of `Album.downloadPlan`
+
+    `path` is the sanitized target path without extension, the extension is chosen from the content type once downloaded
+    `extension` is the extension of the page's url
+    `existing` is the file already matching the page, including `_SKIPPED` markers, the page is not downloaded if it is set
+    """
+    __slots__ = ("index", "url", "path", "extension", "existing")
+    index: int
+    url: str
+    path: Path
+    extension: str
+    existing: Path
+
+    @property
+    def exists(self) -> bool:
+        return self.existing is not None
+
+    @property
+    def skippedPath(self) -> Path:
+        """
+        Returns the path of the marker written when the page can't be downloaded
+        """
+        return self.path.with_name(self.path.name + "_SKIPPED")
+
+
 class Album():
     """
     A class representing an album and it's properties
     """
 
-    def __init__(self, albumInput: Union[int, str, dict], download: bool = False, handler: RequestHandler = None):
+    def __init__(self, albumInput: Union[int, str, dict], download: bool = False, handler: RequestHandler = None, fields: Union[str, Iterable[str]] = None):
         """
         Initializes an album object based on albumInput
         albumInput can either be:
@@ -231,30 +459,62 @@ class Album():
         Some pages might not show up if you don't login using a Luscious object
 
         A json dict being the json response of the Album
+
+        `fields` selects which fields are fetched, either a field set name ("minimal", "standard", "full")
+        or a list of field names, see `queries.ALBUM_FIELDS`. Defaults to the standard fields
+        Fields that were not fetched are fetched when they are first accessed
         """
         if(not handler):
             self.__handler = RequestHandler()
         else:
             self.__handler = handler
 
+        # only a missing album or an invalid input is NotFound, request errors are raised as they are
         try:
             if(isinstance(albumInput, dict)):
                 self.__json = albumInput
                 self.__id = int(self.__json["id"])
             elif(isinstance(albumInput, int)):
                 self.__id = albumInput
-                self.__json = self.__handler.post(
-                    Luscious.API, json=getAlbumInfo(self.__id)).json()["data"]["album"]["get"]
+                self.__json = None
             elif(isinstance(albumInput, str)):
                 self.__id = int(albumInput.split("_")[-1][:-1])
-                self.__json = self.__handler.post(
-                    Luscious.API, json=getAlbumInfo(self.__id)).json()["data"]["album"]["get"]
+                self.__json = None
             else:
                 raise TypeError
-            self.__url = urljoin(Luscious.HOME, self.__json["url"])
-        except:
+        except (KeyError, TypeError, ValueError, IndexError):
+            raise NotFound
+        if(self.__json is None):
+            json = self.__handler.graphql(
+                Luscious.API, getAlbumInfo(self.__id, fields))
+            try:
+                self.__json = json["data"]["album"]["get"]
+            except (KeyError, TypeError):
+                raise NotFound
+        if(not isinstance(self.__json, dict) or "id" not in self.__json):
             raise NotFound
 
+    def __field(self, name: str):
+        """
+        Returns a field of the Album's json, fetching it if it is missing
+        """
+        if(name not in self.__json):
+            self.fetchFields((name,))
+        return self.__json[name]
+
+    def fetchFields(self, fields: Union[str, Iterable[str]]) -> dict:
+        """
+        Fetches the fields that are missing from the Album's json and adds them to it
+        `fields` can either be a field set name ("minimal", "standard", "full") or a list of field names
+        Returns the json of the Album
+        """
+        missing = [field for field in resolveFields(
+            fields, ALBUM_FIELDS) if field not in self.__json]
+        if(missing):
+            self.__json.update(self.__handler.graphql(
+                Luscious.API, getAlbumInfo(self.__id, missing))["data"]["album"]["get"])
+        return self.__json
+
     def __str__(self) -> str:
         """
         Returns the Album's name
@@ -266,14 +526,14 @@ class Album():
         """
         Returns the name of the Album
         """
-        return self.__json["title"]
+        return self.__field("title")
 
     @cached_property
     def sanitizedName(self) -> str:
         """
         Returns the sanitized name of the Album
         """
-        return sanitize_filepath(self.name)
+        return sanitizePath(self.name)
 
     @cached_property
     def id(self) -> int:
@@ -284,26 +544,26 @@ class Album():
         """
         Returns the url associated with the Album
         """
-        return self.__url
+        return urljoin(Luscious.HOME, self.__field("url"))
 
     @cached_property
     def downloadUrl(self) -> str:
         """
         Returns the the download url of the Album
         """
-        return urljoin(Luscious.HOME, self.json["download_url"])
+        return urljoin(Luscious.HOME, self.__field("download_url"))
 
     @cached_property
     def contentUrls(self) -> List[str]:
         """
         Returns the list of content associated with the Album
         """
-        picsJson = self.__handler.post(Luscious.API, json=getPictures(
-            self.__id)).json()["data"]["picture"]["list"]
+        picsJson = self.__handler.graphql(Luscious.API, getPictures(
+            self.__id))["data"]["picture"]["list"]
         pics = [i["url_to_original"] for i in picsJson["items"]]
         for i in range(1, int(picsJson["info"]["total_pages"])):
-            picsJson = self.__handler.post(
-                Luscious.API, json=getPictures(self.__id, page=i+1)).json()
+            picsJson = self.__handler.graphql(
+                Luscious.API, getPictures(self.__id, page=i+1))
             pics += [i["url_to_original"]
                      for i in picsJson["data"]["picture"]["list"]["items"]]
         return pics
@@ -313,28 +573,28 @@ class Album():
         """
         Returns the number of pictures in the Album(This count includes the gifs)
         """
-        return self.json["number_of_pictures"]
+        return self.__field("number_of_pictures")
 
     @cached_property
     def animatedCount(self) -> int:
         """
         Returns the number of animated pictures in the Album
         """
-        return self.json["number_of_animated_pictures"]
+        return self.__field("number_of_animated_pictures")
 
     @cached_property
     def thumbnail(self) -> str:
         """
         Returns the url of the Album's thumbnail
         """
-        return self.json["cover"]["url"]
+        return self.__field("cover")["url"]
 
     @cached_property
     def description(self) -> str:
         """
         Returns the description of the Album
         """
-        return self.json["description"]
+        return self.__field("description")
 
     @cached_property
     def genres(self) -> List[Genre]:
@@ -342,7 +602,7 @@ class Album():
         The Album's genres
         Returns a list of `Genre` objects
         """
-        return [Genre(genre["id"], genre["title"], genre["url"]) for genre in self.json["genres"]]
+        return [Genre.fromJson(genre) for genre in self.__field("genres")]
 
     @cached_property
     def tags(self) -> List[Tag]:
@@ -350,7 +610,28 @@ class Album():
         The Album's tags
         Returns a list of `Tag` objects
         """
-        return [Tag(tag["id"], tag["text"], tag["category"], tag["url"]) for tag in self.json["tags"]]
+        return [Tag.fromJson(tag) for tag in self.__field("tags")]
+
+    @cached_property
+    def tagIds(self) -> FrozenSet[str]:
+        """
+        Returns the set of the Album's tag ids
+        """
+        return frozenset(tag["id"] for tag in self.__field("tags"))
+
+    @cached_property
+    def genreIds(self) -> FrozenSet[str]:
+        """
+        Returns the set of the Album's genre ids
+        """
+        return frozenset(genre["id"] for genre in self.__field("genres"))
+
+    def hasTag(self, tag: Union[Tag, str, int]) -> bool:
+        """
+        Returns True if the Album has the given tag
+        `tag` can either be a `Tag` object or a tag id
+        """
+        return (tag.id if isinstance(tag, Tag) else str(tag)) in self.tagIds
 
     @cached_property
     def artists(self) -> List[str]:
@@ -379,7 +660,7 @@ class Album():
         The intended audience of the Album
         Returns a dict with fields "id", "title", "url"
         """
-        return self.json["audiences"]
+        return self.__field("audiences")
 
     @cached_property
     def ongoing(self) -> bool:
@@ -390,23 +671,21 @@ class Album():
         Warning:
         Will return False for all non manga albums
         """
-        onTag = Tag(id='1895669', text='ongoing',
-                    category=None, url='/tags/ongoing/')
-        return onTag in self.tags
+        return _ONGOING_TAG_ID in self.tagIds
 
     @cached_property
     def isManga(self) -> bool:
         """
         Returns True if the Album is a manga, False if it's a picture set
         """
-        return self.json["is_manga"]
+        return self.__field("is_manga")
 
     @cached_property
     def contentType(self) -> str:
         """
         Returns the content type of the Album which is either "Manga", "Non-Erotic" or "Real People"
         """
-        return self.json["content"]["title"]
+        return self.__field("content")["title"]
 
     @cached_property
     def json(self) -> dict:
@@ -422,47 +701,420 @@ class Album():
         """
         return self.__handler
 
-    def downloadContent(self, root: Union[Path, str] = Path("Albums"), printProgress: bool = True):
+    @cached_property
+    def summary(self) -> "AlbumSummary":
+        """
+        Returns an `AlbumSummary` of the Album
+        """
+        return AlbumSummary.fromJson(self.json)
+
+    def __fetchPage(self, url: str, fpath: Path, priority: priorityOptions, job: DownloadJob, storage: Storage, profiler: Profiler = NULL_PROFILER) -> Tuple[Path, int, Future]:
+        """
+        Streams a page to the sanitized path `fpath` of `storage` with the extension of its content type
+        Returns the path of the page, its size and the `Future` of the file's storing
+        The network and storage time of the page are recorded as one `fetch` and one `write` span laid end to end
+        """
+        start = time.perf_counter_ns()
+        r, chunks = self.handler.download(url, priority, job)
+        with profiler.span("guess_extension"):
+            fpath = fpath.with_suffix(
+                mimetypes.guess_extension(r.headers['content-type']))
+        f = storage.open(fpath, int(r.headers.get('content-length', 0)))
+        size = 0
+        writing = 0
+        try:
+            if(profiler.enabled):
+                for chunk in chunks:
+                    t = time.perf_counter_ns()
+                    f.write(chunk)
+                    writing += time.perf_counter_ns() - t
+                    size += len(chunk)
+            else:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+        except BaseException as e:
+            f.abort(e)
+            raise
+        t = time.perf_counter_ns()
+        stored = f.close()
+        end = time.perf_counter_ns()
+        writing += end - t
+        profiler.record("fetch", start, end - start - writing, url=url)
+        profiler.record("write", end - writing, writing, bytes=size)
+        return fpath, size, stored
+
+    def __directory(self, root: Union[Path, str]) -> Path:
+        """
+        Returns the sanitized folder of the Album in `root`
+        """
+        return Path(sanitizePath(str(Path(root).joinpath(self.sanitizedName))))
+
+    def downloadPlan(self, root: Union[Path, str] = Path("Albums"), storage: Storage = None) -> List[PlannedPage]:
+        """
+        Returns the `PlannedPage` of every page `downloadContent` would download to the folder `root` of `storage`
+        (the local filesystem by default), without downloading anything
+        The folder is listed once and the names are sanitized once per album, not once per page
+        """
+        root = self.__directory(root)
+        names = (storage or LocalStorage()).find(root)
+        padding = len(str(self.pictureCount - 1))
+        plan = []
+        for i, url in enumerate(self.contentUrls):
+            urlName = Path(urlparse(url).path).name
+            if(self.isManga):
+                name = f"{self.sanitizedName}_{str(i).zfill(padding)}"
+            else:
+                name = sanitizePath(urlName)
+            path = root.joinpath(name)
+            # the first file starting with the page's stem, the way `glob(f"{stem}*")` would match it
+            j = bisect_left(names, path.stem)
+            existing = root.joinpath(names[j]) if j < len(
+                names) and names[j].startswith(path.stem) else None
+            plan.append(PlannedPage(i, url, path, Path(
+                urlName).suffix, existing))
+        return plan
+
+    def downloadContent(self, root: Union[Path, str] = Path("Albums"), printProgress: bool = True, priority: priorityOptions = priorityOptions.Normal, firstPages: int = 0, progress: ProgressReporter = None, pipeline: MediaPipeline = None, writer: DiskWriter = None, storage: Storage = None, profiler: Profiler = None):
         """
         Downloads all pictures that don't already exist in the directory to the folder `root`
         The progress bar can be disabled by passing False to printProgress
+        `priority` is the priority of the download if the handler has a `DownloadScheduler`,
+        the first `firstPages` pages are downloaded one priority class higher
+        `progress` is a `ProgressReporter` receiving the download's events instead of the progress bar,
+        pass one `AggregateProgress` to several downloads to share a single progress bar
+        `pipeline` is a `MediaPipeline` verifying (and optionally converting) the downloaded pages in other processes
+        while the download goes on, corrupt pages are downloaded again in the same run
+        `writer` is a `DiskWriter` writing the pages on its own thread so the connections never wait for the disk,
+        the method returns once every page is written
+        `storage` is the `Storage` the pages are streamed to and checked against, `root` is then a folder of the storage.
+        Defaults to the local filesystem, pass the `writer` to the `LocalStorage` when using both
+        `profiler` is a `Profiler` recording the time spent in `contentUrls`, the existence checks, the fetches,
+        `guess_extension` and the writes
         Returns the list of downloaded files' filepaths
         """
-        paths = []
-        if(isinstance(root, str)):
-            root = Path(root)
-        root = root.joinpath(sanitize_filepath(self.sanitizedName))
-        root.mkdir(parents=True, exist_ok=True)
-        with trange(len(self.contentUrls), disable=not printProgress, desc=self.name) as tq:
-            for i in tq:
-                if(self.isManga):
-                    fpath = root.joinpath(
-                        f"{self.sanitizedName}_{str(i).zfill(len(str(self.pictureCount-1)))}")
-                else:
-                    fpath = root.joinpath(
-                        Path(urlparse(self.contentUrls[i]).path).name)
-                printName = f'"{self.name}" page {i+1}/{self.pictureCount}'
-                globResult = list(root.glob(f"{fpath.stem}*"))
-                if(globResult):
-                    tq.set_description(f"{printName} exists")
-                    paths.append(globResult[0])
-                    continue
+        profiler = profiler or NULL_PROFILER
+        with profiler.capture("Album.downloadContent", album=self.id):
+            if(storage is None):
+                storage = LocalStorage(writer=writer)
+            elif(writer is not None):
+                raise ValueError("pass the writer to the LocalStorage")
+            if(pipeline and storage.localPath(self.__directory(root)) is None):
+                raise ValueError("the media pipeline needs a storage with local files")
+            paths = []
+            job = self.handler.scheduler.job(
+                priority, self.name) if self.handler.scheduler else None
+            ownProgress = progress is None
+            if(ownProgress):
+                progress = AggregateProgress(
+                    desc=self.name) if printProgress else SILENT
+            report = progress.enabled
+            storage.makedirs(self.__directory(root))
+            with profiler.span("contentUrls"):
+                self.contentUrls
+            with profiler.span("plan"):
+                plan = self.downloadPlan(root, storage)
+            # Future of the pipeline -> (page index, page path without extension, attempts)
+            checks = {}
+            # Future of the writer -> (page index, page path without extension, size, attempts)
+            writes = {}
+            # indexes of the pages written in this run
+            downloaded = set()
+
+            def pagePriority(i: int) -> priorityOptions:
+                return priorityOptions(max(priority - 1, 0)) if i < firstPages else priority
+
+            def skip(i: int, fpath: Path, e: Exception):
+                storage.open(plan[i].skippedPath, 0).close()
+                if(report):
+                    progress.emit(DownloadEvent(
+                        eventTypes.PageSkipped, self.name, i, path=fpath, error=e))
+
+            def written(i: int, fpath: Path, size: int, attempts: int):
+                downloaded.add(i)
+                if(report and attempts == 0):
+                    progress.emit(DownloadEvent(
+                        eventTypes.PageDone, self.name, i, bytes=size, path=paths[i]))
+                if(pipeline):
+                    checks[pipeline.submit(storage.localPath(paths[i]))] = (
+                        i, fpath, attempts)
+
+            def fetch(i: int, fpath: Path, attempts: int):
+                paths[i], size, pending = self.__fetchPage(
+                    plan[i].url, fpath, pagePriority(i), job, storage, profiler)
+                if(report):
+                    progress.emit(DownloadEvent(
+                        eventTypes.Bytes, self.name, i, bytes=size))
+                if(pending.done() and pending.exception() is None):
+                    written(i, fpath, size, attempts)
                 else:
-                    try:
-                        r = self.handler.get(self.contentUrls[i])
-                        fpath = fpath.with_suffix(
-                            mimetypes.guess_extension(r.headers['content-type']))
-                        with open(sanitize_filepath(fpath), "wb") as f:
-                            f.write(r.content)
-                        tq.set_description(f'{printName} done')
+                    writes[pending] = (i, fpath, size, attempts)
+
+            def collect(wait: bool):
+                while(writes or checks):
+                    if(wait):
+                        futureWait(list(writes) + list(checks),
+                                   return_when=FIRST_COMPLETED)
+                    done = [f for f in writes if f.done()]
+                    for future in done:
+                        i, fpath, size, attempts = writes.pop(future)
+                        if(future.exception()):
+                            paths[i] = fpath
+                            skip(i, fpath, future.exception())
+                        else:
+                            written(i, fpath, size, attempts)
+                    futures = [f for f in checks if f.done()]
+                    if(not futures and not done):
+                        if(wait):
+                            continue
+                        return
+                    for future in futures:
+                        i, fpath, attempts = checks.pop(future)
+                        result = future.result()
+                        if(result.ok):
+                            paths[i] = paths[i].with_name(Path(result.path).name)
+                            continue
+                        Path(result.path).unlink(missing_ok=True)
+                        if(report):
+                            progress.emit(DownloadEvent(
+                                eventTypes.PageCorrupt, self.name, i, path=paths[i], error=DownloadFailed(result.error)))
+                        if(attempts >= pipeline.retries):
+                            paths[i] = fpath
+                            skip(i, fpath, DownloadFailed(result.error))
+                            continue
+                        try:
+                            fetch(i, fpath, attempts + 1)
+                        except Exception as e:
+                            paths[i] = fpath
+                            skip(i, fpath, e)
+
+            try:
+                if(report):
+                    progress.emit(DownloadEvent(
+                        eventTypes.Started, self.name, total=len(plan)))
+                for page in plan:
+                    i, fpath = page.index, page.path
+                    if(page.exists):
+                        if(report):
+                            progress.emit(DownloadEvent(
+                                eventTypes.PageExists, self.name, i, path=page.existing))
+                        paths.append(page.existing)
+                        continue
+                    else:
                         paths.append(fpath)
-                    except Exception as e:
-                        with open(sanitize_filepath(fpath.with_name(fpath.name + "_SKIPPED")), "wb") as _:
-                            pass
-                        tq.set_description(
-                            f'{printName} skipped because {e}')
-                        paths.append(fpath)
-        return paths
+                        try:
+                            if(report):
+                                progress.emit(DownloadEvent(
+                                    eventTypes.PageStarted, self.name, i))
+                            fetch(i, fpath, 0)
+                        except Exception as e:
+                            paths[i] = fpath
+                            skip(i, fpath, e)
+                    collect(wait=False)
+                with profiler.span("collect"):
+                    collect(wait=True)
+                with profiler.span("sync"):
+                    storage.sync([paths[i] for i in sorted(downloaded)])
+                if(report):
+                    progress.emit(DownloadEvent(eventTypes.Finished, self.name))
+            finally:
+                if(ownProgress):
+                    progress.close()
+            return paths
+
+
+class AlbumSummary():
+    """
+    A lightweight record of an album's most used fields
+
+    Unlike `Album` it does not keep the json response or a request handler around,
+    use `toAlbum` to get the full `Album` object
+    """
+    __slots__ = ("id", "title", "pictureCount",
+                 "animatedCount", "isManga", "tagIds")
+
+    def __init__(self, id: int, title: str, pictureCount: int = 0, animatedCount: int = 0, isManga: bool = None, tagIds: Tuple[str, ...] = ()):
+        self.id = id
+        self.title = title
+        self.pictureCount = pictureCount
+        self.animatedCount = animatedCount
+        self.isManga = isManga
+        self.tagIds = tagIds
+
+    @classmethod
+    def fromJson(cls, json: dict) -> "AlbumSummary":
+        """
+        Returns an `AlbumSummary` from an album json dict
+        Works with both the full album json and the minimal json of search results
+        """
+        return cls(int(json["id"]),
+                   json["title"],
+                   int(json.get("number_of_pictures") or 0),
+                   int(json.get("number_of_animated_pictures") or 0),
+                   json.get("is_manga"),
+                   tuple(str(tag["id"]) for tag in json.get("tags") or ()))
+
+    def hasTag(self, tag: Union[Tag, str, int]) -> bool:
+        """
+        Returns True if the album has `tag`, either a `Tag` or a tag id
+        Tag ids are strings, like `Album.tagIds`
+        """
+        return (tag.id if isinstance(tag, Tag) else str(tag)) in self.tagIds
+
+    def toAlbum(self, handler: RequestHandler = None) -> "Album":
+        """
+        Fetches and returns the full `Album` object of the summary
+        """
+        return Album(self.id, handler=handler)
+
+    def __eq__(self, other) -> bool:
+        if(not isinstance(other, AlbumSummary)):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"AlbumSummary(id={self.id!r}, title={self.title!r}, pictureCount={self.pictureCount!r})"
+
+    def __str__(self) -> str:
+        """
+        Returns the Album's name
+        """
+        return self.title
+
+
+class AlbumSummaryStore():
+    """
+    A columnar container of `AlbumSummary` records
+
+    Every field is stored in its own `array` (titles as one utf-8 buffer) instead of one object per album,
+    which keeps millions of search or landing results in a few hundred MB.
+    Indexing the store returns `AlbumSummary` records built on the fly
+    """
+    COLUMNS = ("id", "title", "pictureCount", "animatedCount", "isManga")
+
+    def __init__(self, summaries: Iterable[Union[AlbumSummary, dict]] = ()):
+        self.__ids = array("q")
+        self.__pictureCounts = array("l")
+        self.__animatedCounts = array("l")
+        # -1 unknown, 0 picture set, 1 manga
+        self.__manga = array("b")
+        self.__titles = bytearray()
+        self.__titleOffsets = array("q", [0])
+        # tag ids are stored as integers and returned as strings
+        self.__tagIds = array("q")
+        self.__tagOffsets = array("q", [0])
+        self.extend(summaries)
+
+    def append(self, summary: Union[AlbumSummary, dict]):
+        """
+        Appends an `AlbumSummary` or an album json dict to the store
+        """
+        if(isinstance(summary, dict)):
+            summary = AlbumSummary.fromJson(summary)
+        self.__ids.append(summary.id)
+        self.__pictureCounts.append(summary.pictureCount)
+        self.__animatedCounts.append(summary.animatedCount)
+        self.__manga.append(-1 if summary.isManga is None else int(summary.isManga))
+        self.__titles += summary.title.encode("utf-8")
+        self.__titleOffsets.append(len(self.__titles))
+        self.__tagIds.extend(int(tagId) for tagId in summary.tagIds)
+        self.__tagOffsets.append(len(self.__tagIds))
+
+    def extend(self, summaries: Iterable[Union[AlbumSummary, dict]]):
+        """
+        Appends every `AlbumSummary` or album json dict in `summaries` to the store
+        """
+        for summary in summaries:
+            self.append(summary)
+
+    def __len__(self) -> int:
+        return len(self.__ids)
+
+    def __iter__(self) -> Iterator[AlbumSummary]:
+        return (self[i] for i in range(len(self)))
+
+    def __index(self, index: int) -> int:
+        # negative indexes count from the end, like lists
+        if(index < 0):
+            index += len(self)
+        if(not 0 <= index < len(self)):
+            raise IndexError("AlbumSummaryStore index out of range")
+        return index
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[AlbumSummary, "AlbumSummaryStore"]:
+        """
+        Returns the `AlbumSummary` at `index`, or a new store when `index` is a slice
+        """
+        if(isinstance(index, slice)):
+            return self.select(range(len(self))[index])
+        index = self.__index(index)
+        manga = self.__manga[index]
+        return AlbumSummary(self.__ids[index],
+                            self.title(index),
+                            self.__pictureCounts[index],
+                            self.__animatedCounts[index],
+                            None if manga == -1 else bool(manga),
+                            tuple(str(tagId) for tagId in self.__tagIds[self.__tagOffsets[index]:self.__tagOffsets[index+1]]))
+
+    def title(self, index: int) -> str:
+        """
+        Returns the title at `index` without building the whole record
+        """
+        index = self.__index(index)
+        return self.__titles[self.__titleOffsets[index]:self.__titleOffsets[index+1]].decode("utf-8")
+
+    def column(self, name: str) -> Sequence:
+        """
+        Returns a whole column by name, one of `AlbumSummaryStore.COLUMNS`
+        Numeric columns are returned as the underlying arrays and must not be modified
+        """
+        if(name == "id"):
+            return self.__ids
+        if(name == "title"):
+            return [self.title(i) for i in range(len(self))]
+        if(name == "pictureCount"):
+            return self.__pictureCounts
+        if(name == "animatedCount"):
+            return self.__animatedCounts
+        if(name == "isManga"):
+            return [None if m == -1 else bool(m) for m in self.__manga]
+        raise KeyError(name)
+
+    def select(self, indices: Iterable[int]) -> "AlbumSummaryStore":
+        """
+        Returns a new store with the records at `indices` in the given order
+        """
+        store = AlbumSummaryStore()
+        store.extend(self[i] for i in indices)
+        return store
+
+    def filter(self, predicate: Callable[[AlbumSummary], bool]) -> "AlbumSummaryStore":
+        """
+        Returns a new store with the records for which `predicate` returns True
+        """
+        return self.select(i for i in range(len(self)) if predicate(self[i]))
+
+    def sort(self, key: str = "id", reverse: bool = False) -> "AlbumSummaryStore":
+        """
+        Returns a new store sorted by the column `key`, one of `AlbumSummaryStore.COLUMNS`
+        """
+        column = self.column(key)
+        if(key == "isManga"):
+            column = self.__manga
+        return self.select(sorted(range(len(self)), key=column.__getitem__, reverse=reverse))
+
+    def hasTag(self, index: int, tag: Union[Tag, str, int]) -> bool:
+        """
+        Returns True if the record at `index` has `tag`, either a `Tag` or a tag id
+        """
+        index = self.__index(index)
+        return int(tag.id if isinstance(tag, Tag) else tag) in self.__tagIds[self.__tagOffsets[index]:self.__tagOffsets[index+1]]
+
+    def toAlbum(self, index: int, handler: RequestHandler = None) -> "Album":
+        """
+        Fetches and returns the full `Album` object of the record at `index`
+        """
+        return Album(self.__ids[self.__index(index)], handler=handler)
 
 
 class Video():
@@ -470,7 +1122,7 @@ class Video():
     A class representing a video and it's properties
     """
 
-    def __init__(self, videoInput: Union[int, str, dict], download: bool = False, handler: RequestHandler = None):
+    def __init__(self, videoInput: Union[int, str, dict], download: bool = False, handler: RequestHandler = None, fields: Union[str, Iterable[str]] = None):
         """
         Initializes an Video object based on videoInput
         videoInput can either be:
@@ -481,6 +1133,10 @@ class Video():
         Some pages might not show up if you don't login using a Luscious object
 
         A json dict being the json response of the Video
+
+        `fields` selects which fields are fetched, either a field set name ("minimal", "standard", "full")
+        or a list of field names, see `queries.VIDEO_FIELDS`. Defaults to the standard fields
+        Fields that were not fetched are fetched when they are first accessed
         """
 
         if(not handler):
@@ -488,24 +1144,52 @@ class Video():
         else:
             self.__handler = handler
 
+        # only a missing video or an invalid input is NotFound, request errors are raised as they are
         try:
             if(isinstance(videoInput, dict)):
                 self.__json = videoInput
                 self.__id = int(self.__json["id"])
             elif(isinstance(videoInput, int)):
                 self.__id = videoInput
-                self.__json = self.__handler.post(
-                    Luscious.API, json=getVideoInfo(self.__id)).json()["data"]["video"]["get"]
+                self.__json = None
             elif(isinstance(videoInput, str)):
                 self.__id = int(videoInput.split("_")[-1][:-1])
-                self.__json = self.__handler.post(
-                    Luscious.API, json=getVideoInfo(self.__id)).json()["data"]["video"]["get"]
+                self.__json = None
             else:
                 raise TypeError
-            self.__url = urljoin(Luscious.HOME, self.__json["url"])
-        except:
+        except (KeyError, TypeError, ValueError, IndexError):
+            raise NotFound
+        if(self.__json is None):
+            json = self.__handler.graphql(
+                Luscious.API, getVideoInfo(self.__id, fields))
+            try:
+                self.__json = json["data"]["video"]["get"]
+            except (KeyError, TypeError):
+                raise NotFound
+        if(not isinstance(self.__json, dict) or "id" not in self.__json):
             raise NotFound
 
+    def __field(self, name: str):
+        """
+        Returns a field of the Video's json, fetching it if it is missing
+        """
+        if(name not in self.__json):
+            self.fetchFields((name,))
+        return self.__json[name]
+
+    def fetchFields(self, fields: Union[str, Iterable[str]]) -> dict:
+        """
+        Fetches the fields that are missing from the Video's json and adds them to it
+        `fields` can either be a field set name ("minimal", "standard", "full") or a list of field names
+        Returns the json of the Video
+        """
+        missing = [field for field in resolveFields(
+            fields, VIDEO_FIELDS) if field not in self.__json]
+        if(missing):
+            self.__json.update(self.__handler.graphql(
+                Luscious.API, getVideoInfo(self.__id, missing))["data"]["video"]["get"])
+        return self.__json
+
     def __str__(self) -> str:
         return self.name
 
@@ -514,14 +1198,14 @@ class Video():
         """
         Returns the name of the Video
         """
-        return self.__json["title"]
+        return self.__field("title")
 
     @cached_property
     def sanitizedName(self) -> str:
         """
         Returns the sanitized name of the Video
         """
-        return sanitize_filepath(self.name)
+        return sanitizePath(self.name)
 
     @cached_property
     def id(self) -> int:
@@ -532,7 +1216,7 @@ class Video():
         """
         Returns the url associated with the Video
         """
-        return self.__url
+        return urljoin(Luscious.HOME, self.__field("url"))
 
     @cached_property
     def contentUrls(self) -> List[str]:
@@ -542,21 +1226,23 @@ class Video():
         Warning:
         Some resolutions may not exist
         """
-        return [self.json["v240p"], self.json["v360p"], self.json["v720p"], self.json["v1080p"]]
+        qualities = ("v240p", "v360p", "v720p", "v1080p")
+        json = self.fetchFields(qualities)
+        return [json[quality] for quality in qualities]
 
     @cached_property
     def thumbnail(self) -> str:
         """
         Returns the url of the Video's thumbnail
         """
-        return self.json["poster_url"]
+        return self.__field("poster_url")
 
     @cached_property
     def description(self) -> str:
         """
         Returns the description of the Video
         """
-        return self.json["description"]
+        return self.__field("description")
 
     @cached_property
     def genres(self) -> List[Genre]:
@@ -564,7 +1250,7 @@ class Video():
         The Album's genres
         Returns a list of `Genre` objects
         """
-        return [Genre(genre["id"], genre["title"], genre["url"]) for genre in self.json["genres"]]
+        return [Genre.fromJson(genre) for genre in self.__field("genres")]
 
     @cached_property
     def tags(self) -> List[Tag]:
@@ -572,7 +1258,28 @@ class Video():
         The Video's tags
         Returns a list of `Tag` objects
         """
-        return [Tag(tag["id"], tag["text"], tag["category"], tag["url"]) for tag in self.json["tags"]]
+        return [Tag.fromJson(tag) for tag in self.__field("tags")]
+
+    @cached_property
+    def tagIds(self) -> FrozenSet[str]:
+        """
+        Returns the set of the Video's tag ids
+        """
+        return frozenset(tag["id"] for tag in self.__field("tags"))
+
+    @cached_property
+    def genreIds(self) -> FrozenSet[str]:
+        """
+        Returns the set of the Video's genre ids
+        """
+        return frozenset(genre["id"] for genre in self.__field("genres"))
+
+    def hasTag(self, tag: Union[Tag, str, int]) -> bool:
+        """
+        Returns True if the Video has the given tag
+        `tag` can either be a `Tag` object or a tag id
+        """
+        return (tag.id if isinstance(tag, Tag) else str(tag)) in self.tagIds
 
     @cached_property
     def audiences(self) -> dict:
@@ -580,14 +1287,14 @@ class Video():
         The intended audience of the Video
         Returns a dict with fields "id", "title", "url"
         """
-        return self.json["audiences"]
+        return self.__field("audiences")
 
     @cached_property
     def contentType(self) -> str:
         """
         Returns the content type of the Video which is either "Hentai", "Non-Erotic" or "Real People"
         """
-        return self.json["content"]["title"]
+        return self.__field("content")["title"]
 
     @cached_property
     def json(self) -> dict:
@@ -603,7 +1310,7 @@ class Video():
         """
         return self.__handler
 
-    def downloadContent(self, downloadQuality: int = 0, root: Union[Path, str] = Path("Videos"), printProgress: bool = True):
+    def downloadContent(self, downloadQuality: int = 0, root: Union[Path, str] = Path("Videos"), printProgress: bool = True, priority: priorityOptions = priorityOptions.Normal, progress: ProgressReporter = None, writer: DiskWriter = None, storage: Storage = None, profiler: Profiler = None):
         """
         FIXME for some reason access to videos are forbidden. This was not the case before. If anybody can help feel free to raise an issue or a pull request
 
@@ -613,36 +1320,86 @@ class Video():
         `downloadQuality` can be a number from 0 to 3 with 0 representing 240p (the lowest quality)
         if the chosen quality is not available it will default to the highest quality available (which is always lower than the chosen quality)
         The progress bar can be disabled by passing False to printProgress
+        `priority` is the priority of the download if the handler has a `DownloadScheduler`
+        `progress` is a `ProgressReporter` receiving the download's events instead of the progress bar
+        `writer` is a `DiskWriter` writing the video on its own thread, the method returns once it is written
+        `storage` is the `Storage` the video is streamed to, `root` is then a folder of the storage.
+        Defaults to the local filesystem, pass the `writer` to the `LocalStorage` when using both
+        `profiler` is a `Profiler` recording the time spent in `contentUrls`, the fetch, `guess_extension` and the writes
         Returns the path of the downloaded video
         """
-        if(isinstance(root, str)):
-            root = Path(root)
-        root = root.joinpath(sanitize_filepath(self.sanitizedName))
-        root.mkdir(parents=True, exist_ok=True)
-        url = self.contentUrls[downloadQuality]
-        if(not url):
-            for i in range(downloadQuality+1):
-                url = self.contentUrls[i] if self.contentUrls[i] else url
-
-        fpath = root.joinpath(self.sanitizedName)
-        printName = self.name
-        r = self.handler.get(url, stream=True)
-        fpath = fpath.with_suffix(
-            mimetypes.guess_extension(r.headers['content-type']))
-        total_size_in_bytes = int(
-            r.headers.get('content-length', 0))
-        with tqdm(total=total_size_in_bytes, disable=not printProgress, unit='iB', unit_scale=True, desc=self.name) as tq:
-            with open(sanitize_filepath(fpath), 'wb') as file:
-                for data in r.iter_content(1024):
-                    tq.update(len(data))
-                    file.write(data)
-            if total_size_in_bytes != 0 and tq.n != total_size_in_bytes:
-                with open(sanitize_filepath(fpath.with_name(fpath.name + "_SKIPPED")), "wb") as _:
-                    pass
-                tq.set_description(f'{printName} skipped')
-                return fpath
-            else:
+        profiler = profiler or NULL_PROFILER
+        with profiler.capture("Video.downloadContent", video=self.id):
+            if(storage is None):
+                storage = LocalStorage(writer=writer)
+            elif(writer is not None):
+                raise ValueError("pass the writer to the LocalStorage")
+            root = Path(sanitizePath(str(Path(root).joinpath(self.sanitizedName))))
+            storage.makedirs(root)
+            with profiler.span("contentUrls"):
+                url = self.contentUrls[downloadQuality]
+            if(not url):
+                for i in range(downloadQuality+1):
+                    url = self.contentUrls[i] if self.contentUrls[i] else url
+
+            fpath = root.joinpath(self.sanitizedName)
+            ownProgress = progress is None
+            if(ownProgress):
+                progress = AggregateProgress(
+                    desc=self.name) if printProgress else SILENT
+            report = progress.enabled
+            try:
+                if(report):
+                    progress.emit(DownloadEvent(
+                        eventTypes.Started, self.name, total=1))
+                start = time.perf_counter_ns()
+                r, chunks = self.handler.download(url, priority)
+                with profiler.span("guess_extension"):
+                    fpath = fpath.with_suffix(
+                        mimetypes.guess_extension(r.headers['content-type']))
+                total_size_in_bytes = int(
+                    r.headers.get('content-length', 0))
+                if(report):
+                    progress.emit(DownloadEvent(
+                        eventTypes.PageStarted, self.name, 0, total=total_size_in_bytes, path=fpath))
+                received = 0
+                writing = 0
+                file = storage.open(fpath, total_size_in_bytes)
+                try:
+                    for data in chunks:
+                        received += len(data)
+                        t = time.perf_counter_ns()
+                        file.write(data)
+                        writing += time.perf_counter_ns() - t
+                        if(report):
+                            progress.emit(DownloadEvent(
+                                eventTypes.Bytes, self.name, 0, bytes=len(data)))
+                except BaseException as e:
+                    file.abort(e)
+                    raise
+                t = time.perf_counter_ns()
+                file.close().result()
+                end = time.perf_counter_ns()
+                writing += end - t
+                profiler.record("fetch", start, end - start - writing, url=url)
+                profiler.record("write", end - writing, writing, bytes=received)
+                with profiler.span("sync"):
+                    storage.sync([fpath])
+                if total_size_in_bytes != 0 and received != total_size_in_bytes:
+                    storage.open(fpath.with_name(
+                        fpath.name + "_SKIPPED"), 0).close()
+                    if(report):
+                        progress.emit(DownloadEvent(eventTypes.PageSkipped, self.name, 0, path=fpath, error=DownloadFailed(
+                            f"received {received} of {total_size_in_bytes} bytes")))
+                elif(report):
+                    progress.emit(DownloadEvent(
+                        eventTypes.PageDone, self.name, 0, bytes=received, path=fpath))
+                if(report):
+                    progress.emit(DownloadEvent(eventTypes.Finished, self.name))
                 return fpath
+            finally:
+                if(ownProgress):
+                    progress.close()
 
 
 class Luscious(RequestHandler):
@@ -653,44 +1410,148 @@ class Luscious(RequestHandler):
     HOME = "https://members.luscious.net"
     LOGIN = "https://members.luscious.net/accounts/login/"
 
-    def __init__(self, username: str = None, password: str = None, timeout: Tuple[float, float] = RequestHandler._timeout, total: int = RequestHandler._total, status_forcelist: List[int] = RequestHandler._status_forcelist.copy(), backoff_factor: int = RequestHandler._backoff_factor):
+    def __init__(self, username: str = None, password: str = None, timeout: Tuple[float, float] = RequestHandler._timeout, total: int = RequestHandler._total, status_forcelist: List[int] = RequestHandler._status_forcelist.copy(), backoff_factor: int = RequestHandler._backoff_factor, persistedQueries: bool = False, codec: Union[str, JSONCodec] = None, scheduler: DownloadScheduler = None, coalesce: bool = True, cacheSize: int = 128, sessionFile: Union[Path, str] = None):
         """
         Initializes a Luscious object
 
         Pass in your <https://members.luscious.net> email and password to login and use your own genre filters
         Some genres are blocked by default and will not show up without login
+
+        Pass `persistedQueries=True` to send persisted query hashes instead of the full GraphQL documents
+        `codec` selects the JSON codec used for the API, see `RequestHandler`
+        `scheduler` is a `DownloadScheduler` shared by the downloads of this object's albums and videos
+        `coalesce` shares identical concurrent requests, see `RequestHandler`
+        `cacheSize` is the number of most recently used `Album` and `Video` objects kept by `getAlbum` and `getVideo`,
+        0 disables the cache
+
+        `sessionFile` is a file where the login cookies are saved. When it holds cookies they are used instead of logging in,
+        and the login is only done again once the API rejects a request. Processes using the same file share one login
         """
-        super().__init__(timeout, total, status_forcelist, backoff_factor)
+        super().__init__(timeout, total, status_forcelist,
+                         backoff_factor, persistedQueries, codec, scheduler, coalesce)
         self.__handler = RequestHandler(
-            self.timeout, self.total, self.status_forcelist, self.backoff_factor)
-
+            self.timeout, self.total, self.status_forcelist, self.backoff_factor, self.persistedQueries, self.codec, self.scheduler, self.coalesce)
+        self.cacheSize = cacheSize
+        self.__cache = OrderedDict()
+        self.__cacheLock = threading.Lock()
+
+        self.__username = username
+        self.__password = password
+        self.__session = SessionStore(sessionFile) if sessionFile else None
+        self.__sessionVersion = None
+        if(self.__session):
+            with self.__session.lock():
+                if(self.__session.load(self.__handler.session.cookies)):
+                    self.__sessionVersion = self.__session.version()
+                elif(username and password and self.__login()):
+                    self.__session.save(self.__handler.session.cookies)
+                    self.__sessionVersion = self.__session.version()
+        elif(username and password):
+            self.__login()
         if(username and password):
-            response = self.__handler.post(
-                self.LOGIN, data={"login": username, "password": password, "remember": "on"})
-            if("The username and/or password you specified are not correct." in response.text):
-                print("Login failed. Please check your credentials")
-
-    def getAlbum(self, albumInput: Union[int, str], download: bool = False) -> Album:
+            self.__handler.onAuthFailure = self.__reauthenticate
+
+    def __login(self) -> bool:
+        """
+        Logs in with the credentials, returns False if they were rejected
+        """
+        response = self.__handler.post(
+            self.LOGIN, data={"login": self.__username, "password": self.__password, "remember": "on"})
+        if("The username and/or password you specified are not correct." in response.text):
+            print("Login failed. Please check your credentials")
+            return False
+        return True
+
+    def __reauthenticate(self):
+        """
+        Logs in again after the API rejected the session
+        With a session file, cookies saved by another process since they were loaded are used instead of logging in
+        """
+        if(not self.__session):
+            self.__handler.session.cookies.clear()
+            self.__login()
+            return
+        with self.__session.lock():
+            version = self.__session.version()
+            if(version is not None and version != self.__sessionVersion):
+                self.__handler.session.cookies.clear()
+                if(self.__session.load(self.__handler.session.cookies)):
+                    self.__sessionVersion = version
+                    return
+            self.__handler.session.cookies.clear()
+            if(self.__login()):
+                self.__session.save(self.__handler.session.cookies)
+                self.__sessionVersion = self.__session.version()
+
+    def getAlbum(self, albumInput: Union[int, str], download: bool = False, fields: Union[str, Iterable[str]] = None) -> Album:
         """
         Return an `Album` object based on albumInput
 
         albumInput can either be an integer, being the ablbum Id
         Example (NSFW)<https://www.luscious.net/albums/animated-gifs_374481/>'s Id being  374481
         Or it can be a string, the link itself
+
+        `fields` selects the fields to fetch ("minimal", "standard", "full" or a list of field names)
+        The remaining fields are fetched when first accessed
+
+        Albums are cached by id, getting the same album again returns the same object
         """
-        return Album(albumInput, download, handler=self.__handler)
+        return self.__cached(Album, albumInput, lambda: Album(albumInput, download, handler=self.__handler, fields=fields))
 
-    def getVideo(self, videoInput: Union[int, str], download: bool = False) -> Video:
+    def getVideo(self, videoInput: Union[int, str], download: bool = False, fields: Union[str, Iterable[str]] = None) -> Video:
         """
         Return an `Video` object based on videoInput
 
         videoInput can either be an integer, being the Video id
         Example (NSFW)<https://luscious.net/videos/dropout_episode_1_hq_11401/>'s Id being  11401
         Or it can be a string, the link itself
+
+        `fields` selects the fields to fetch ("minimal", "standard", "full" or a list of field names)
+        The remaining fields are fetched when first accessed
+
+        Videos are cached by id, getting the same video again returns the same object
+        """
+        return self.__cached(Video, videoInput, lambda: Video(videoInput, download, handler=self.__handler, fields=fields))
+
+    @cached_property
+    def handler(self) -> RequestHandler:
+        """
+        Returns the handler object used by the Luscious object and its albums and videos
         """
-        return Video(videoInput, download, handler=self.__handler)
+        return self.__handler
 
-    def searchAlbum(self, query: str, page: int = 1, display: str = "rating_all_time", albumType: albumTypeOptions = albumTypeOptions.All, contentType: contentTypeOptions = contentTypeOptions.All) -> List[int]:
+    def __cached(self, kind: type, input: Union[int, str], create: Callable):
+        """
+        Returns the cached object of type `kind` for `input`, calling `create` on a miss
+        """
+        if(not self.cacheSize):
+            return create()
+        try:
+            key = (kind, input if isinstance(input, int)
+                   else int(input.split("_")[-1][:-1]))
+        except (AttributeError, ValueError):
+            return create()
+        with self.__cacheLock:
+            item = self.__cache.get(key)
+            if(item is not None):
+                self.__cache.move_to_end(key)
+                return item
+        item = create()
+        with self.__cacheLock:
+            item = self.__cache.setdefault(key, item)
+            self.__cache.move_to_end(key)
+            while(len(self.__cache) > self.cacheSize):
+                self.__cache.popitem(last=False)
+        return item
+
+    def clearCache(self):
+        """
+        Empties the `Album` and `Video` cache
+        """
+        with self.__cacheLock:
+            self.__cache.clear()
+
+    def searchAlbum(self, query: str, page: int = 1, display: str = "rating_all_time", albumType: albumTypeOptions = albumTypeOptions.All, contentType: contentTypeOptions = contentTypeOptions.All, fields: Union[str, Iterable[str]] = None, profiler: Profiler = None) -> List[int]:
         """
         Searches <https://luscious.net> for albums with given query
 
@@ -702,16 +1563,49 @@ class Luscious(RequestHandler):
         Returns a result dict with 2 keys `items` and `info`
 
         `items` is  a list of album ids
+        If `fields` is given ("minimal", "standard", "full" or a list of field names) `items` is instead a list of
+        `Album` objects built from the search results with those fields, the remaining fields are fetched when first accessed
 
         `info` is a dict with fields `page`, `has_next_page`, `has_previous_page`, `total_items`, `total_pages`, `items_per_page` ,`url_complete`
+
+        `profiler` is a `Profiler` recording the time spent in the request and in building the results
+        """
+        profiler = profiler or NULL_PROFILER
+        with profiler.capture("Luscious.searchAlbum", query=query, page=page):
+            with profiler.span("graphql"):
+                json = self.__handler.graphql(
+                    self.API, albumSearchQuery(query, page=page, display=display, albumType=albumType.value, contentType=contentType.value, fields=fields))
+            with profiler.span("parse"):
+                if(fields is None):
+                    items = [int(i["id"])
+                             for i in json["data"]["album"]["list"]["items"]]
+                else:
+                    items = [Album(i, handler=self.__handler)
+                             for i in json["data"]["album"]["list"]["items"]]
+            return {"info": json["data"]["album"]["list"]["info"], "items": items}
+
+    def searchAlbumSummaries(self, query: str, page: int = 1, display: str = "rating_all_time", albumType: albumTypeOptions = albumTypeOptions.All, contentType: contentTypeOptions = contentTypeOptions.All, store: AlbumSummaryStore = None, fields: Union[str, Iterable[str]] = None, profiler: Profiler = None) -> dict:
+        """
+        Same as `searchAlbum` but `items` is an `AlbumSummaryStore` of the results
+
+        Pass an existing `store` to append the results of several pages to it
+        Pass `fields` to fetch more than the default fields, for example ["is_manga", "tags"],
+        the fields the summaries are built from are always fetched
         """
-        json = self.__handler.post(
-            self.API, json=albumSearchQuery(query, page=page, display=display, albumType=albumType.value, contentType=contentType.value)).json()
-        albumIds = [int(i["id"])
-                    for i in json["data"]["album"]["list"]["items"]]
-        return {"info": json["data"]["album"]["list"]["info"], "items": albumIds}
+        if(fields is not None):
+            fields = ALBUM_SEARCH_FIELDS[1:] + resolveFields(fields)
+        profiler = profiler or NULL_PROFILER
+        with profiler.capture("Luscious.searchAlbumSummaries", query=query, page=page):
+            with profiler.span("graphql"):
+                json = self.__handler.graphql(
+                    self.API, albumSearchQuery(query, page=page, display=display, albumType=albumType.value, contentType=contentType.value, fields=fields))
+            if(store is None):
+                store = AlbumSummaryStore()
+            with profiler.span("parse"):
+                store.extend(json["data"]["album"]["list"]["items"])
+            return {"info": json["data"]["album"]["list"]["info"], "items": store}
 
-    def searchVideo(self, query: str, page: int = 1, display: str = "rating_all_time", contentType: contentTypeOptions = contentTypeOptions.All) -> List[int]:
+    def searchVideo(self, query: str, page: int = 1, display: str = "rating_all_time", contentType: contentTypeOptions = contentTypeOptions.All, fields: Union[str, Iterable[str]] = None, profiler: Profiler = None) -> List[int]:
         """
         Searches <https://luscious.net> for videos with given query
 
@@ -722,14 +1616,54 @@ class Luscious(RequestHandler):
         Returns a result dict with 2 keys `items` and `info`
 
         `items` is  a list of video ids
+        If `fields` is given ("minimal", "standard", "full" or a list of field names) `items` is instead a list of
+        `Video` objects built from the search results with those fields, the remaining fields are fetched when first accessed
 
         `info` is a dict with fields `page`, `has_next_page`, `has_previous_page`, `total_items`, `total_pages`, `items_per_page` ,`url_complete`
-        """
-        json = self.__handler.post(
-            self.API, json=videoSearchQuery(query, page=page, display=display, contentType=contentType.value)).json()
-        videoIds = [int(i["id"])
-                    for i in json["data"]["video"]["list"]["items"]]
-        return {"info": json["data"]["video"]["list"]["info"], "items": videoIds}
+
+        `profiler` is a `Profiler` recording the time spent in the request and in building the results
+        """
+        profiler = profiler or NULL_PROFILER
+        with profiler.capture("Luscious.searchVideo", query=query, page=page):
+            with profiler.span("graphql"):
+                json = self.__handler.graphql(
+                    self.API, videoSearchQuery(query, page=page, display=display, contentType=contentType.value, fields=fields))
+            with profiler.span("parse"):
+                if(fields is None):
+                    items = [int(i["id"])
+                             for i in json["data"]["video"]["list"]["items"]]
+                else:
+                    items = [Video(i, handler=self.__handler)
+                             for i in json["data"]["video"]["list"]["items"]]
+            return {"info": json["data"]["video"]["list"]["info"], "items": items}
+
+    def iterSearchAlbum(self, query: str, display: str = "rating_all_time", albumType: albumTypeOptions = albumTypeOptions.All, contentType: contentTypeOptions = contentTypeOptions.All, fields: Union[str, Iterable[str]] = None, startPage: int = 1, maxPages: int = None, profiler: Profiler = None) -> Iterator[Union[int, Album]]:
+        """
+        Yields the results of `searchAlbum` page by page, starting at `startPage`, until the last page or `maxPages` pages
+        Only one page of results is held in memory, `profiler` records every page's search
+        """
+        page = startPage
+        while(maxPages is None or page < startPage + maxPages):
+            result = self.searchAlbum(
+                query, page, display, albumType, contentType, fields, profiler)
+            yield from result["items"]
+            if(not result["info"]["has_next_page"]):
+                return
+            page += 1
+
+    def iterSearchVideo(self, query: str, display: str = "rating_all_time", contentType: contentTypeOptions = contentTypeOptions.All, fields: Union[str, Iterable[str]] = None, startPage: int = 1, maxPages: int = None, profiler: Profiler = None) -> Iterator[Union[int, Video]]:
+        """
+        Yields the results of `searchVideo` page by page, starting at `startPage`, until the last page or `maxPages` pages
+        Only one page of results is held in memory, `profiler` records every page's search
+        """
+        page = startPage
+        while(maxPages is None or page < startPage + maxPages):
+            result = self.searchVideo(
+                query, page, display, contentType, fields, profiler)
+            yield from result["items"]
+            if(not result["info"]["has_next_page"]):
+                return
+            page += 1
 
     def getLandingPage(self, limit: int = 15):
         """
@@ -738,8 +1672,8 @@ class Luscious(RequestHandler):
         Returns a dict with 3 keys: `Hentai Manga`,`Hentai Pictures` and `Porn Pictures`
         With the value of all three being a list of integer ids of their respective content
         """
-        json = self.__handler.post(
-            self.API, json=landingPageQuery(limit)).json()
+        json = self.__handler.graphql(
+            self.API, landingPageQuery(limit))
 
         return {k["title"]: [int(i["id"]) for i in k["items"]]
                 for k in json["data"]["landing_page_album"]["frontpage"]["sections"]}
@@ -751,6 +1685,6 @@ class Luscious(RequestHandler):
         Note:
         This isn't truly random but this is the same random mechanism in the website itself
         """
-        json = self.__handler.post(self.API, json=albumSearchQuery(
-            "", 1, "date_last_interaction")).json()
+        json = self.__handler.graphql(self.API, albumSearchQuery(
+            "", 1, "date_last_interaction"))
         return int(sample(json["data"]["album"]["list"]["items"], 1)[0]["id"])  # pylint: disable=unsubscriptable-object
@@ -0,0 +1,164 @@
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Tuple, Union
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".jpe", ".png",
+                  ".gif", ".webp", ".bmp", ".avif"}
+
+
+@dataclass
+class MediaResult():
+    """
+    The result of processing a downloaded file
+
+    `ok` is False if the file is truncated or corrupt, `error` then holds the reason
+    `path` is the path of the file to keep, which is the converted file if the original was replaced
+    `outputs` are the paths of the converted file and the thumbnail
+    `processingError` holds the reason the conversion or the thumbnail failed, the file is kept and `ok` is unaffected
+    """
+    path: str
+    ok: bool
+    error: str = None
+    outputs: List[str] = field(default_factory=list)
+    processingError: str = None
+
+
+def checkSignature(path: Path) -> str:
+    """
+    Checks the start and end markers of common image formats without decoding them
+    Returns the reason the file is corrupt or None
+    """
+    size = path.stat().st_size
+    if(size == 0):
+        return "empty file"
+    with open(path, "rb") as f:
+        head = f.read(16)
+        f.seek(max(size - 1024, 0))
+        tail = f.read()
+    if(head.startswith(b"\xff\xd8")):
+        return None if b"\xff\xd9" in tail else "truncated JPEG"
+    if(head.startswith(b"\x89PNG")):
+        return None if b"IEND" in tail else "truncated PNG"
+    if(head.startswith(b"GIF8")):
+        return None if tail.rstrip(b"\0").endswith(b";") else "truncated GIF"
+    if(head.startswith(b"RIFF") and head[8:12] == b"WEBP"):
+        return None if int.from_bytes(head[4:8], "little") + 8 <= size else "truncated WEBP"
+    return None
+
+
+def processMedia(path: Union[Path, str], verify: bool = True, convert: str = None, quality: int = 80, thumbnail: Tuple[int, int] = None, keepOriginal: bool = True) -> MediaResult:
+    """
+    Verifies, converts and thumbnails a downloaded file, runs in the pipeline's worker processes
+
+    Images are fully decoded with Pillow when it is installed, otherwise only their markers are checked.
+    Only a failed verification marks the file as corrupt, conversion and thumbnail failures are reported in
+    `processingError` and the downloaded file is kept
+    """
+    path = Path(path)
+    result = MediaResult(str(path), True)
+    im = None
+    try:
+        if(verify):
+            result.error = checkSignature(path)
+        isImage = Image is not None and path.suffix.lower() in IMAGE_SUFFIXES
+        if(isImage and not result.error and (verify or convert or thumbnail)):
+            if(verify):
+                with Image.open(path) as check:
+                    check.verify()
+            im = Image.open(path)
+            im.load()
+    except Exception as e:
+        # without `verify` a file that can't be decoded is only a processing failure
+        if(verify):
+            result.error = f"{type(e).__name__}: {e}"
+        else:
+            result.processingError = f"{type(e).__name__}: {e}"
+        if(im is not None):
+            im.close()
+            im = None
+    result.ok = result.error is None
+    if(im is None):
+        return result
+    converted = None
+    try:
+        if(convert and path.suffix.lower() != f".{convert.lower()}"):
+            target = path.with_suffix(f".{convert.lower()}")
+            try:
+                im.save(target, format=convert.upper(), quality=quality,
+                        save_all=getattr(im, "is_animated", False))
+            except Exception:
+                target.unlink(missing_ok=True)
+                raise
+            converted = target
+            result.outputs.append(str(converted))
+        if(thumbnail):
+            thumbs = path.parent.joinpath("thumbnails")
+            thumbs.mkdir(exist_ok=True)
+            out = thumbs.joinpath(f"{path.stem}.jpg")
+            im.seek(0)
+            thumb = im.convert("RGB")
+            thumb.thumbnail(thumbnail)
+            thumb.save(out, format="JPEG", quality=quality)
+            result.outputs.append(str(out))
+    except Exception as e:
+        result.processingError = f"{type(e).__name__}: {e}"
+    finally:
+        im.close()
+    if(converted and not keepOriginal):
+        path.unlink()
+        result.path = str(converted)
+    return result
+
+
+class MediaPipeline():
+    """
+    Processes downloaded files on a process pool while the download continues
+
+    Pass it to `Album.downloadContent`, every downloaded page is verified (decoded if Pillow is installed),
+    optionally converted to `convert` ("webp", "avif", ...) and thumbnailed to fit in `thumbnail`.
+    Corrupt pages are downloaded again up to `retries` times before they are marked as skipped
+
+    Use it as a context manager or call `close` to shut the pool down
+    """
+
+    def __init__(self, workers: int = None, verify: bool = True, convert: str = None, quality: int = 80, thumbnail: Tuple[int, int] = None, keepOriginal: bool = True, retries: int = 1, executor: Executor = None):
+        """
+        `workers` is the number of processes, defaults to the number of CPUs
+        `keepOriginal` keeps the downloaded file next to the converted one
+        `executor` is an existing executor to use instead of a new process pool
+        """
+        if(Image is None and (convert or thumbnail)):
+            raise ImportError(
+                "Pillow is required to convert images or make thumbnails")
+        self.options = {"verify": verify, "convert": convert, "quality": quality,
+                        "thumbnail": thumbnail, "keepOriginal": keepOriginal}
+        self.retries = retries
+        self.__ownExecutor = executor is None
+        self.executor = executor or ProcessPoolExecutor(
+            workers or os.cpu_count())
+
+    def submit(self, path: Union[Path, str]) -> Future:
+        """
+        Schedules the processing of `path`, returns a `Future` of its `MediaResult`
+        """
+        return self.executor.submit(processMedia, str(path), **self.options)
+
+    def close(self):
+        """
+        Waits for the scheduled files and shuts the process pool down
+        """
+        if(self.__ownExecutor):
+            self.executor.shutdown()
+
+    def __enter__(self) -> "MediaPipeline":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,183 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, List, Union
+
+
+class Span():
+    """
+    A timed phase recorded by a `Profiler`, times are `time.perf_counter_ns` values
+    """
+    __slots__ = ("name", "start", "duration", "thread", "args")
+
+    def __init__(self, name: str, start: int, duration: int, thread: int, args: dict = None):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.thread = thread
+        self.args = args
+
+    def __repr__(self) -> str:
+        return f"Span({self.name!r}, {self.duration / 1e6:.3f}ms)"
+
+
+class Profiler():
+    """
+    Records timed spans of the phases of downloads and searches
+
+    Pass it as `profiler` to `Album.downloadContent`, `Video.downloadContent` or the `Luscious` search methods.
+    With `cprofile` and `tracemalloc` the outermost profiled call also runs under cProfile and tracemalloc,
+    their results are kept in `stats` and `memory`.
+    Use `report` for a summary or `writeChromeTrace` to open the spans in chrome://tracing or Perfetto
+    """
+    enabled = True
+
+    def __init__(self, cprofile: bool = False, tracemalloc: bool = False):
+        self.cprofile = cprofile
+        self.tracemalloc = tracemalloc
+        self.spans: List[Span] = []
+        # pstats.Stats of the cProfile captures
+        self.stats: pstats.Stats = None
+        # peak traced memory in bytes and the top allocation sites of the tracemalloc captures
+        self.memory: Dict[str, object] = {"peak": 0, "top": []}
+        self.__depth = 0
+        self.__lock = threading.Lock()
+        self.__origin = time.perf_counter_ns()
+
+    @contextmanager
+    def span(self, name: str, **args):
+        """
+        Records the time spent in the `with` block as a span named `name`, `args` are attached to it
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter_ns() - start, **args)
+
+    def record(self, name: str, start: int, duration: int, **args):
+        """
+        Records a span measured by the caller, used for phases spread over a loop
+        """
+        self.spans.append(Span(name, start, duration,
+                          threading.get_ident(), args or None))
+
+    @contextmanager
+    def capture(self, name: str, **args):
+        """
+        A span of a whole call, the outermost one is also captured with cProfile and tracemalloc if they are enabled
+        """
+        with self.__lock:
+            self.__depth += 1
+            outermost = self.__depth == 1
+        profile = cProfile.Profile() if outermost and self.cprofile else None
+        tracing = outermost and self.tracemalloc and not tracemalloc.is_tracing()
+        if(tracing):
+            tracemalloc.start()
+        if(profile):
+            profile.enable()
+        try:
+            with self.span(name, **args):
+                yield
+        finally:
+            if(profile):
+                profile.disable()
+            if(tracing):
+                peak = tracemalloc.get_traced_memory()[1]
+                snapshot = tracemalloc.take_snapshot().filter_traces(
+                    (tracemalloc.Filter(False, cProfile.__file__), tracemalloc.Filter(False, tracemalloc.__file__)))
+                tracemalloc.stop()
+                self.memory["peak"] = max(self.memory["peak"], peak)
+                self.memory["top"] = [str(stat)
+                                      for stat in snapshot.statistics("lineno")[:10]]
+            if(profile):
+                with self.__lock:
+                    if(self.stats is None):
+                        self.stats = pstats.Stats(profile)
+                    else:
+                        self.stats.add(profile)
+            with self.__lock:
+                self.__depth -= 1
+
+    def summary(self) -> Dict[str, dict]:
+        """
+        Returns the count, total, mean and max duration in milliseconds of the spans by name
+        """
+        summary = {}
+        for span in self.spans:
+            entry = summary.setdefault(
+                span.name, {"count": 0, "total": 0.0, "max": 0.0})
+            entry["count"] += 1
+            entry["total"] += span.duration / 1e6
+            entry["max"] = max(entry["max"], span.duration / 1e6)
+        for entry in summary.values():
+            entry["mean"] = entry["total"] / entry["count"]
+        return summary
+
+    def report(self, limit: int = 20) -> str:
+        """
+        Returns a text report of the spans by total time, followed by the top `limit` functions of cProfile
+        and the tracemalloc results if they were captured
+        """
+        lines = [
+            f"{'span':<32}{'count':>8}{'total ms':>12}{'mean ms':>12}{'max ms':>12}"]
+        for name, entry in sorted(self.summary().items(), key=lambda item: -item[1]["total"]):
+            lines.append(
+                f"{name:<32}{entry['count']:>8}{entry['total']:>12.2f}{entry['mean']:>12.3f}{entry['max']:>12.3f}")
+        if(self.stats is not None):
+            out = io.StringIO()
+            self.stats.stream = out
+            self.stats.sort_stats("cumulative").print_stats(limit)
+            lines.append(out.getvalue())
+        if(self.memory["top"]):
+            lines.append(
+                f"peak traced memory: {self.memory['peak'] / 1048576:.1f} MiB")
+            lines.extend(self.memory["top"])
+        return "\n".join(lines)
+
+    def chromeTrace(self) -> dict:
+        """
+        Returns the spans in the Chrome trace event format
+        """
+        pid = os.getpid()
+        return {"traceEvents": [{"name": span.name, "ph": "X", "ts": (span.start - self.__origin) / 1000,
+                                 "dur": span.duration / 1000, "pid": pid, "tid": span.thread,
+                                 "args": span.args or {}} for span in self.spans],
+                "displayTimeUnit": "ms"}
+
+    def writeChromeTrace(self, path: Union[Path, str]):
+        """
+        Writes `chromeTrace` to `path`
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chromeTrace(), f)
+
+
+class NullProfiler(Profiler):
+    """
+    Records nothing, the default profiler
+    """
+    enabled = False
+
+    def __init__(self):
+        super().__init__()
+        self.__null = nullcontext()
+
+    def span(self, name: str, **args):
+        return self.__null
+
+    def capture(self, name: str, **args):
+        return self.__null
+
+    def record(self, name: str, start: int, duration: int, **args):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,149 @@
+import threading
+import time
+from enum import Enum
+from pathlib import Path
+from typing import Callable
+
+from tqdm import tqdm
+
+
+class eventTypes(Enum):
+    """
+    Types of `DownloadEvent`
+    """
+    Started = "started"
+    PageStarted = "page_started"
+    PageDone = "page_done"
+    PageExists = "page_exists"
+    PageSkipped = "page_skipped"
+    PageCorrupt = "page_corrupt"
+    Bytes = "bytes"
+    Finished = "finished"
+
+
+class DownloadEvent():
+    """
+    An event of a download job
+
+    `job` is the name of the Album or Video being downloaded
+    `index` is the page index for page events
+    `total` is the number of pages for `Started` events (1 for videos) and the expected number of bytes,
+    if known, for `PageStarted` events
+    `bytes` is the number of bytes received for `Bytes` and `PageDone` events
+    `path` is the path of the page or video file
+    `error` is the exception that caused a `PageSkipped` or `PageCorrupt` event,
+    a `PageCorrupt` page that can't be downloaded again is followed by a `PageSkipped` event
+    """
+    __slots__ = ("type", "job", "index", "total", "bytes", "path", "error")
+
+    def __init__(self, type: eventTypes, job: str, index: int = None, total: int = None, bytes: int = 0, path: Path = None, error: Exception = None):
+        self.type = type
+        self.job = job
+        self.index = index
+        self.total = total
+        self.bytes = bytes
+        self.path = path
+        self.error = error
+
+    def __repr__(self) -> str:
+        return f"DownloadEvent({self.type.name}, job={self.job!r}, index={self.index!r}, bytes={self.bytes!r})"
+
+
+class ProgressReporter():
+    """
+    Receives the `DownloadEvent` of downloads
+    Subclass it and override `emit`, events are only built when `enabled` is True
+    """
+    enabled = True
+
+    def emit(self, event: DownloadEvent):
+        """
+        Called for every event
+        """
+        pass
+
+    def close(self):
+        """
+        Called once the reporter is no longer used by the download that created it
+        """
+        pass
+
+
+class SilentReporter(ProgressReporter):
+    """
+    Ignores every event, no event is built or formatted
+    """
+    enabled = False
+
+
+class CallbackReporter(ProgressReporter):
+    """
+    Passes every event to `callback`
+    """
+
+    def __init__(self, callback: Callable[[DownloadEvent], None]):
+        self.callback = callback
+
+    def emit(self, event: DownloadEvent):
+        self.callback(event)
+
+
+class AggregateProgress(ProgressReporter):
+    """
+    A single progress bar for any number of concurrent downloads
+
+    Events only update counters, the bar is redrawn at most once every `interval` seconds.
+    Pass the same object to several downloads to get one bar for all of them
+    """
+
+    def __init__(self, desc: str = None, interval: float = 0.5, **tqdmOptions):
+        self.interval = interval
+        self.pages = 0
+        self.totalPages = 0
+        self.skipped = 0
+        self.corrupt = 0
+        self.bytes = 0
+        self.__jobs = 0
+        # pages already counted as done that turned out corrupt, by job
+        self.__corrupt = {}
+        self.__last = 0
+        self.__lock = threading.Lock()
+        self.__bar = tqdm(total=0, desc=desc, unit="page", **tqdmOptions)
+
+    def emit(self, event: DownloadEvent):
+        with self.__lock:
+            if(event.type is eventTypes.Bytes):
+                self.bytes += event.bytes
+            elif(event.type is eventTypes.Started):
+                self.__jobs += 1
+                self.totalPages += event.total or 0
+            elif(event.type in (eventTypes.PageDone, eventTypes.PageExists)):
+                self.pages += 1
+            elif(event.type is eventTypes.PageSkipped):
+                self.skipped += 1
+                if(event.index not in self.__corrupt.get(event.job, ())):
+                    self.pages += 1
+            elif(event.type is eventTypes.PageCorrupt):
+                self.corrupt += 1
+                self.__corrupt.setdefault(event.job, set()).add(event.index)
+            elif(event.type is eventTypes.Finished):
+                self.__jobs -= 1
+            now = time.monotonic()
+            if(now - self.__last >= self.interval or event.type is eventTypes.Finished):
+                self.__last = now
+                self.__render()
+
+    def __render(self):
+        self.__bar.total = self.totalPages
+        self.__bar.n = self.pages
+        self.__bar.set_postfix_str(
+            f"{self.bytes / 1048576:.1f} MiB, {self.skipped} skipped, {self.corrupt} corrupt, {self.__jobs} active", refresh=False)
+        self.__bar.refresh()
+
+    def close(self):
+        with self.__lock:
+            self.__render()
+        self.__bar.close()
+
+
+SILENT = SilentReporter()
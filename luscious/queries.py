@@ -1,19 +1,284 @@
-def getAlbumInfo(albumId):
+import hashlib
+import json
+import re
+from functools import lru_cache
+
+
+def minifyQuery(query: str) -> str:
     """
-    Get album info query
+    Strips the insignificant whitespace of a GraphQL document
 
-    :param albumId: album id
-    :return: Query
+    :param query: GraphQL document
+    :return: Minified document
+    """
+    return re.sub(r"\s*([{}():,!=\[\]])\s*", r"\1", re.sub(r"\s+", " ", query)).strip()
+
+
+@lru_cache(maxsize=None)
+def queryHash(query: str) -> str:
+    """
+    Hash of a GraphQL document as used by persisted queries
+
+    :param query: GraphQL document
+    :return: sha256 hex digest
+    """
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+_bodyPrefixes = {}
+
+
+def serializeQuery(js: dict, persisted: bool = False, dumps=None, register: bool = False) -> bytes:
+    """
+    Serializes a query dict to a POST body
+    The part of the body holding the document is serialized once per document, only the variables are serialized per call
+
+    :param js: Query as returned by the query functions
+    :param persisted: Send the persisted query hash instead of the document
+    :param dumps: Function encoding the variables to compact json bytes, defaults to the standard library
+    :param register: With `persisted`, also send the document so the server stores it under its hash
+    :return: Request body
+    """
+    key = (js["query"], persisted, register)
+    prefix = _bodyPrefixes.get(key)
+    if(prefix is None):
+        head = {"query": js["query"]} if register or not persisted else {}
+        if(persisted):
+            head["extensions"] = {"persistedQuery": {
+                "version": 1, "sha256Hash": queryHash(js["query"])}}
+        prefix = json.dumps(head, separators=(",", ":"))[:-1].encode("utf-8") + b',"variables":'
+        _bodyPrefixes[key] = prefix
+    if(dumps is None):
+        variables = json.dumps(js["variables"], separators=(",", ":")).encode("utf-8")
+    else:
+        variables = dumps(js["variables"])
+    return prefix + variables + b"}"
+
+
+def isPersistedQueryNotFound(response: dict) -> bool:
+    """
+    Checks whether the server did not recognize a persisted query hash
+
+    :param response: Decoded json response
+    :return: True if the full document has to be sent
+    """
+    for error in response.get("errors") or ():
+        code = (error.get("extensions") or {}).get("code")
+        if(code in ("PERSISTED_QUERY_NOT_FOUND", "PERSISTED_QUERY_NOT_SUPPORTED")
+                or error.get("message") in ("PersistedQueryNotFound", "PersistedQueryNotSupported")):
+            return True
+    return False
+
+
+def isPersistedQueryNotSupported(response: dict) -> bool:
+    """
+    Checks whether the server does not support persisted queries at all
+
+    :param response: Decoded json response
+    :return: True if the document has to be sent without a hash from now on
     """
-    query = """query getAlbumInfo($id: ID!) {
-        album {
-            get(id: $id) {
-            ... on Album {...AlbumStandard}
-            ... on MutationError {errors {code message}}
+    for error in response.get("errors") or ():
+        if((error.get("extensions") or {}).get("code") == "PERSISTED_QUERY_NOT_SUPPORTED"
+                or error.get("message") == "PersistedQueryNotSupported"):
+            return True
+    return False
+
+
+def isAuthFailure(response: dict) -> bool:
+    """
+    Checks whether the server rejected the request because the session is not logged in anymore
+
+    :param response: Decoded json response
+    :return: True if a new login is needed
+    """
+    for error in response.get("errors") or ():
+        code = str((error.get("extensions") or {}).get("code") or error.get("code") or "").upper()
+        if(code in ("UNAUTHENTICATED", "UNAUTHORIZED", "NOT_AUTHENTICATED", "LOGIN_REQUIRED", "FORBIDDEN")):
+            return True
+    return False
+
+
+ALBUM_FIELDS = {
+    "minimal": ("id", "title", "url", "is_manga", "number_of_pictures", "number_of_animated_pictures"),
+    "standard": ("id", "title", "tags", "is_manga", "content", "genres", "cover", "description", "audiences",
+                 "number_of_pictures", "number_of_animated_pictures", "url", "download_url"),
+}
+ALBUM_FIELDS["full"] = ALBUM_FIELDS["standard"] + ("slug", "language", "created", "modified", "rating",
+                                                   "number_of_favorites", "number_of_dislikes", "like_status", "is_featured")
+
+VIDEO_FIELDS = {
+    "minimal": ("id", "title", "url"),
+    "standard": ("id", "title", "tags", "content", "genres", "description", "audiences", "url",
+                 "poster_url", "subtitle_url", "v240p", "v360p", "v720p", "v1080p"),
+}
+VIDEO_FIELDS["full"] = VIDEO_FIELDS["standard"] + ("slug", "created", "modified", "rating",
+                                                   "number_of_favorites", "number_of_dislikes", "like_status")
+
+
+def resolveFields(fields, fieldSets: dict = ALBUM_FIELDS) -> tuple:
+    """
+    Resolves a field selection to a tuple of field names
+    "id" and "url" are always selected
+
+    :param fields: Name of a field set ("minimal", "standard", "full"), an iterable of field names or None for "standard"
+    :param fieldSets: ALBUM_FIELDS or VIDEO_FIELDS
+    :return: Tuple of field names
+    """
+    if(fields is None):
+        fields = "standard"
+    if(isinstance(fields, str)):
+        try:
+            fields = fieldSets[fields]
+        except KeyError:
+            raise ValueError(f"Unknown field set {fields!r}") from None
+    fields = tuple(dict.fromkeys(fields))
+    return tuple(f for f in ("id", "url") if f not in fields) + fields
+
+
+@lru_cache(maxsize=None)
+def albumInfoDocument(fields: tuple) -> str:
+    """
+    Minified getAlbumInfo document selecting `fields`, built once per field tuple
+
+    :param fields: Tuple of album field names
+    :return: GraphQL document
+    """
+    return minifyQuery(f"""query getAlbumInfo($id: ID!) {{
+    album {{
+        get(id: $id) {{
+        ... on Album {{...AlbumStandard}}
+        ... on MutationError {{errors {{code message}}}}
+        }}
+    }}
+}}
+fragment AlbumStandard on Album{{{" ".join(fields)}}}""")
+
+
+@lru_cache(maxsize=None)
+def videoInfoDocument(fields: tuple) -> str:
+    """
+    Minified getVideoInfo document selecting `fields`, built once per field tuple
+
+    :param fields: Tuple of video field names
+    :return: GraphQL document
+    """
+    return minifyQuery(f"""query getVideoInfo($id: ID!) {{
+    video {{
+        get(id: $id) {{
+        ... on Video {{...VideoStandard}}
+        ... on MutationError {{errors {{code message}}}}
+        }}
+    }}
+}}
+fragment VideoStandard on Video{{{" ".join(fields)}}}""")
+
+
+ALBUM_INFO_QUERY = albumInfoDocument(ALBUM_FIELDS["standard"])
+
+VIDEO_INFO_QUERY = videoInfoDocument(VIDEO_FIELDS["standard"])
+
+PICTURES_QUERY = minifyQuery("""query ListAlbumPictures($input: PictureListInput!) {
+    picture {
+        list(input: $input) {
+            info {...pageInfo} 
+            items {...PicUrls}
+        }
+    }
+} 
+fragment pageInfo on FacetCollectionInfo {
+    page total_items total_pages items_per_page url_complete
+} 
+fragment PicUrls on Picture {
+    url_to_original url_to_video url
+}
+""")
+
+ALBUM_SEARCH_FIELDS = ("__typename", "id", "title",
+                       "number_of_pictures", "number_of_animated_pictures")
+
+VIDEO_SEARCH_FIELDS = ("__typename", "id", "title")
+
+
+@lru_cache(maxsize=None)
+def albumSearchDocument(fields: tuple) -> str:
+    """
+    Minified AlbumList document selecting `fields` for every item, built once per field tuple
+
+    :param fields: Tuple of album field names
+    :return: GraphQL document
+    """
+    return minifyQuery(f"""query AlbumList($input: AlbumListInput!) {{
+    album {{
+        list(input: $input) {{
+            info {{...FacetCollectionInfo}}
+            items {{...AlbumMinimal}}
+        }}
+    }}
+}}
+fragment FacetCollectionInfo on FacetCollectionInfo {{
+    page has_next_page has_previous_page total_items total_pages items_per_page url_complete
+}}
+fragment AlbumMinimal on Album {{
+    {" ".join(fields)}
+}}
+""")
+
+
+@lru_cache(maxsize=None)
+def videoSearchDocument(fields: tuple) -> str:
+    """
+    Minified VideoList document selecting `fields` for every item, built once per field tuple
+
+    :param fields: Tuple of video field names
+    :return: GraphQL document
+    """
+    return minifyQuery(f"""query VideoList($input: AlbumListInput!) {{
+    video {{
+        list(input: $input) {{
+            info {{...FacetCollectionInfo}}
+            items {{...VideoMinimal}}
+        }}
+    }}
+}}
+fragment FacetCollectionInfo on FacetCollectionInfo {{
+    page has_next_page has_previous_page total_items total_pages items_per_page url_complete
+}}
+fragment VideoMinimal on Video {{
+    {" ".join(fields)}
+}}
+""")
+
+
+ALBUM_SEARCH_QUERY = albumSearchDocument(ALBUM_SEARCH_FIELDS)
+
+VIDEO_SEARCH_QUERY = videoSearchDocument(VIDEO_SEARCH_FIELDS)
+
+LANDING_PAGE_QUERY = minifyQuery("""query getLandingPage($LIMIT : Int){
+    landing_page_album{
+        frontpage(limit: $LIMIT){
+            ...on LandingPage {
+            sections{
+                ...on AlbumTopHits{title items}
+                ...on VideoTopHits{title}
             }
         }
+            ...on MutationError {status}
+        }
     }
-    fragment AlbumStandard on Album{id title tags is_manga content genres cover description audiences number_of_pictures number_of_animated_pictures url download_url}"""
+}
+""")
+
+
+def getAlbumInfo(albumId, fields=None):
+    """
+    Get album info query
+
+    :param albumId: album id
+    :param fields: field set name, iterable of field names or None for the standard fields
+    :return: Query
+    """
+    query = ALBUM_INFO_QUERY if fields is None else albumInfoDocument(
+        resolveFields(fields, ALBUM_FIELDS))
     js = {
         "query": query,
         "variables": {"id": str(albumId)}
@@ -21,22 +286,16 @@ def getAlbumInfo(albumId):
     return js
 
 
-def getVideoInfo(videoId):
+def getVideoInfo(videoId, fields=None):
     """
     Get video info query
 
     :param videoId: video id
+    :param fields: field set name, iterable of field names or None for the standard fields
     :return: Query
     """
-    query = """query getVideoInfo($id: ID!) {
-        video {
-            get(id: $id) {
-            ... on Video {...VideoStandard}
-            ... on MutationError {errors {code message}}
-            }
-        }
-    }
-    fragment VideoStandard on Video{id title tags content genres description audiences url poster_url subtitle_url v240p v360p v720p v1080p}"""
+    query = VIDEO_INFO_QUERY if fields is None else videoInfoDocument(
+        resolveFields(fields, VIDEO_FIELDS))
     js = {
         "query": query,
         "variables": {"id": str(videoId)}
@@ -52,21 +311,7 @@ def getPictures(albumId: int, page: int = 1):
     :param page: search page
     :return: Query
     """
-    query = """query ListAlbumPictures($input: PictureListInput!) {
-        picture {
-            list(input: $input) {
-                info {...pageInfo} 
-                items {...PicUrls}
-            }
-        }
-    } 
-    fragment pageInfo on FacetCollectionInfo {
-        page total_items total_pages items_per_page url_complete
-    } 
-    fragment PicUrls on Picture {
-        url_to_original url_to_video url
-    }
-    """
+    query = PICTURES_QUERY
     js = {
         "query": query,
         "variables": {
@@ -80,7 +325,7 @@ def getPictures(albumId: int, page: int = 1):
     return js
 
 
-def albumSearchQuery(searchQuery: str, page: int = 1, display: str = "rating_all_time", albumType: str = "All", contentType: str = "0"):
+def albumSearchQuery(searchQuery: str, page: int = 1, display: str = "rating_all_time", albumType: str = "All", contentType: str = "0", fields=None):
     """
     Get search results for a query
     Currently the api is broken and returns extra fields
@@ -90,23 +335,11 @@ def albumSearchQuery(searchQuery: str, page: int = 1, display: str = "rating_all
     :param display: sorting option
     :param albumType: type of album
     :param contentType: type of content to search for
+    :param fields: field set name or iterable of field names of the items, None for ids, titles and counts
     :return: Query
     """
-    query = """query AlbumList($input: AlbumListInput!) {
-        album {
-            list(input: $input) {
-                info {...FacetCollectionInfo}
-                items {...AlbumMinimal}
-            }
-        }
-    }
-    fragment FacetCollectionInfo on FacetCollectionInfo {
-        page has_next_page has_previous_page total_items total_pages items_per_page url_complete
-    }
-    fragment AlbumMinimal on Album {
-        __typename id title number_of_pictures number_of_animated_pictures
-    }
-    """
+    query = ALBUM_SEARCH_QUERY if fields is None else albumSearchDocument(
+        resolveFields(fields, ALBUM_FIELDS))
     js = {
         "query": query,
         "variables": {
@@ -141,7 +374,7 @@ def albumSearchQuery(searchQuery: str, page: int = 1, display: str = "rating_all
     return js
 
 
-def videoSearchQuery(searchQuery: str, page: int = 1, display: str = "rating_all_time", contentType: int = 0):
+def videoSearchQuery(searchQuery: str, page: int = 1, display: str = "rating_all_time", contentType: int = 0, fields=None):
     """
     Get search results for a query
 
@@ -149,23 +382,11 @@ def videoSearchQuery(searchQuery: str, page: int = 1, display: str = "rating_all
     :param display: sorting option
     :param page: initial search page
     :param contentType: type of content to search for
+    :param fields: field set name or iterable of field names of the items, None for ids and titles
     :return: Query
     """
-    query = """query VideoList($input: AlbumListInput!) {
-        video {
-            list(input: $input) {
-                info {...FacetCollectionInfo}
-                items {...VideoMinimal}
-            }
-        }
-    }
-    fragment FacetCollectionInfo on FacetCollectionInfo {
-        page has_next_page has_previous_page total_items total_pages items_per_page url_complete
-    }
-    fragment VideoMinimal on Video {
-        __typename id title
-    }
-    """
+    query = VIDEO_SEARCH_QUERY if fields is None else videoSearchDocument(
+        resolveFields(fields, VIDEO_FIELDS))
     js = {
         "query": query,
         "variables": {
@@ -199,20 +420,7 @@ def landingPageQuery(limit: int = 15):
     :param limit: limit on how many albums to find
     :return: Query
     """
-    query = """query getLandingPage($LIMIT : Int){
-        landing_page_album{
-            frontpage(limit: $LIMIT){
-                ...on LandingPage {
-                sections{
-                    ...on AlbumTopHits{title items}
-                    ...on VideoTopHits{title}
-                }
-            }
-                ...on MutationError {status}
-            }
-        }
-    }
-    """
+    query = LANDING_PAGE_QUERY
     js = {
         "query": query,
         "variables": {
@@ -0,0 +1,102 @@
+import heapq
+import itertools
+import threading
+import time
+from enum import IntEnum
+from typing import Iterable, Iterator
+
+
+class priorityOptions(IntEnum):
+    """
+    Priority classes of downloads, lower values are served first
+    """
+    Interactive = 0
+    Normal = 1
+    Bulk = 2
+
+
+class DownloadJob():
+    """
+    A download job registered with a `DownloadScheduler`
+    Jobs of the same priority share the bandwidth fairly, the job that was served the least bytes goes first
+    """
+
+    def __init__(self, scheduler: "DownloadScheduler", priority: priorityOptions = priorityOptions.Normal, name: str = None):
+        self.scheduler = scheduler
+        self.priority = priority
+        self.name = name
+        self.bytes = 0
+
+    def throttle(self, chunks: Iterable[bytes], priority: priorityOptions = None) -> Iterator[bytes]:
+        """
+        Yields the chunks of `chunks` once the scheduler granted bandwidth for them
+        `priority` overrides the job's priority for these chunks
+        """
+        for chunk in chunks:
+            self.scheduler.acquire(len(chunk), self.priority if priority is None else priority, self)
+            yield chunk
+
+    def __repr__(self) -> str:
+        return f"DownloadJob(name={self.name!r}, priority={self.priority!r}, bytes={self.bytes!r})"
+
+
+class DownloadScheduler():
+    """
+    Shares a global download budget between download jobs
+
+    `bytesPerSecond` is the global budget, None for no limit
+    `burst` is how many bytes can be downloaded at once after being idle, defaults to one second worth of budget
+
+    Waiting chunks are granted strictly by priority class, and within a class to the job that has
+    been served the least bytes so far. Share one scheduler between the request handlers of all jobs
+    """
+
+    def __init__(self, bytesPerSecond: float = None, burst: int = None):
+        self.bytesPerSecond = bytesPerSecond
+        self.burst = burst if burst else max(int(bytesPerSecond or 0), 1 << 16)
+        self.bytes = 0
+        self.__tokens = float(self.burst)
+        self.__last = time.monotonic()
+        self.__condition = threading.Condition()
+        self.__waiting = []
+        self.__counter = itertools.count()
+
+    def job(self, priority: priorityOptions = priorityOptions.Normal, name: str = None) -> DownloadJob:
+        """
+        Returns a new `DownloadJob` of this scheduler
+        """
+        return DownloadJob(self, priority, name)
+
+    def __refill(self):
+        now = time.monotonic()
+        if(self.bytesPerSecond):
+            self.__tokens = min(float(self.burst), self.__tokens +
+                                (now - self.__last) * self.bytesPerSecond)
+        self.__last = now
+
+    def acquire(self, nbytes: int, priority: priorityOptions = priorityOptions.Normal, job: DownloadJob = None):
+        """
+        Blocks until `nbytes` can be downloaded within the budget
+        Chunks larger than `burst` are granted once the bucket is full and put the budget in debt
+        """
+        with self.__condition:
+            ticket = (int(priority), job.bytes if job else 0,
+                      next(self.__counter))
+            heapq.heappush(self.__waiting, ticket)
+            while True:
+                if(self.__waiting[0] is ticket):
+                    self.__refill()
+                    needed = min(nbytes, self.burst)
+                    if(not self.bytesPerSecond or self.__tokens >= needed):
+                        break
+                    self.__condition.wait(
+                        (needed - self.__tokens) / self.bytesPerSecond)
+                else:
+                    self.__condition.wait()
+            heapq.heappop(self.__waiting)
+            if(self.bytesPerSecond):
+                self.__tokens -= nbytes
+            self.bytes += nbytes
+            if(job):
+                job.bytes += nbytes
+            self.__condition.notify_all()
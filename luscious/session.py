@@ -0,0 +1,85 @@
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Union
+
+from requests.cookies import RequestsCookieJar
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class SessionStore():
+    """
+    A cookie jar persisted to a json file, so several processes can share one login
+
+    Writers hold an exclusive lock on `<path>.lock` while they log in and save the cookies
+    """
+
+    def __init__(self, path: Union[Path, str]):
+        self.path = Path(path)
+        self.lockPath = self.path.with_name(self.path.name + ".lock")
+
+    @contextmanager
+    def lock(self):
+        """
+        Holds the exclusive lock of the store, blocking until it is available
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lockPath, "a+b") as f:
+            if(fcntl):
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if(fcntl):
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def version(self) -> int:
+        """
+        Returns the modification time of the cookie file in nanoseconds, None if it doesn't exist
+        """
+        try:
+            return self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def load(self, jar: RequestsCookieJar) -> bool:
+        """
+        Loads the saved cookies into `jar`
+        Returns False if there were no saved cookies
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                cookies = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+        for cookie in cookies:
+            jar.set(cookie["name"], cookie["value"], domain=cookie["domain"], path=cookie["path"],
+                    secure=cookie["secure"], expires=cookie["expires"], rest=cookie["rest"])
+        return bool(cookies)
+
+    def save(self, jar: RequestsCookieJar):
+        """
+        Saves the cookies of `jar`, replacing the file atomically
+        The file holds the session cookie, so it is only readable by its owner
+        """
+        cookies = [{"name": c.name, "value": c.value, "domain": c.domain, "path": c.path,
+                    "secure": c.secure, "expires": c.expires, "rest": c._rest} for c in jar]
+        temp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        # a leftover temp file keeps its old mode
+        os.chmod(temp, 0o600)
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump(cookies, f)
+        os.replace(temp, self.path)
@@ -0,0 +1,296 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path, PurePath
+from typing import Dict, Iterable, List, Union
+
+try:
+    from .writer import DiskWriter
+except ImportError:
+    from writer import DiskWriter
+
+
+def _done(result=None) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+class Storage():
+    """
+    Where `Album.downloadContent` and `Video.downloadContent` put the downloaded files
+
+    Files are addressed by relative or absolute paths, the backend decides what they map to.
+    Subclass it and implement `find` and `open` to add a backend
+    """
+
+    def find(self, directory: PurePath) -> List[str]:
+        """
+        Returns the sorted names of the files in `directory`, an empty list if there are none
+        """
+        raise NotImplementedError
+
+    def exists(self, path: PurePath) -> bool:
+        """
+        Returns True if the file `path` exists
+        """
+        return PurePath(path).name in self.find(PurePath(path).parent)
+
+    def open(self, path: PurePath, size: int = None):
+        """
+        Returns a file object to stream the content of `path` into, `size` is the expected size if known
+        The object has `write(data)`, `abort(error)` and `close()`, which returns a `Future` resolving once the file is stored
+        and raising the error if it couldn't be
+        """
+        raise NotImplementedError
+
+    def makedirs(self, directory: PurePath):
+        """
+        Creates `directory` if the backend has directories
+        """
+        pass
+
+    def sync(self, paths: Iterable[PurePath]):
+        """
+        Makes the stored files durable, called once a download is done
+        """
+        pass
+
+    def localPath(self, path: PurePath) -> Path:
+        """
+        Returns the local file of `path`, None if the backend doesn't store files locally
+        """
+        return None
+
+
+class _LocalFile():
+    """
+    A file written synchronously by `LocalStorage`
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.file = open(path, "wb")
+
+    def write(self, data: bytes):
+        self.file.write(data)
+
+    def close(self) -> Future:
+        self.file.close()
+        return _done(self.path)
+
+    def abort(self, error: Exception = None):
+        self.file.close()
+        self.path.unlink(missing_ok=True)
+
+
+class LocalStorage(Storage):
+    """
+    Stores files on the local filesystem, under `root` if it is set
+
+    Files are written synchronously by the downloading thread, or by `writer` if it is a `DiskWriter`
+    """
+
+    def __init__(self, root: Union[Path, str] = None, writer: DiskWriter = None):
+        self.root = Path(root) if root else None
+        self.writer = writer
+
+    def localPath(self, path: PurePath) -> Path:
+        return self.root.joinpath(path) if self.root else Path(path)
+
+    def find(self, directory: PurePath) -> List[str]:
+        try:
+            with os.scandir(self.localPath(directory)) as entries:
+                return sorted(entry.name for entry in entries)
+        except FileNotFoundError:
+            return []
+
+    def exists(self, path: PurePath) -> bool:
+        return self.localPath(path).exists()
+
+    def open(self, path: PurePath, size: int = None):
+        if(self.writer is None):
+            return _LocalFile(self.localPath(path))
+        return self.writer.open(self.localPath(path), size)
+
+    def makedirs(self, directory: PurePath):
+        self.localPath(directory).mkdir(parents=True, exist_ok=True)
+
+    def sync(self, paths: Iterable[PurePath]):
+        if(self.writer and self.writer.fsync):
+            self.writer.sync([p for p in map(self.localPath, paths)
+                              if p.exists()]).result()
+
+
+class _MemoryFile():
+    """
+    A file of `MemoryStorage`
+    """
+
+    def __init__(self, storage: "MemoryStorage", path: PurePath):
+        self.storage = storage
+        self.path = path
+        self.buffer = bytearray()
+
+    def write(self, data: bytes):
+        self.buffer += data
+
+    def close(self) -> Future:
+        self.storage.files[PurePath(self.path).as_posix()] = bytes(self.buffer)
+        return _done(self.path)
+
+    def abort(self, error: Exception = None):
+        self.buffer = None
+
+
+class MemoryStorage(Storage):
+    """
+    Keeps the files in memory in `files`, a dict of posix path -> content
+    """
+
+    def __init__(self):
+        self.files: Dict[str, bytes] = {}
+
+    def find(self, directory: PurePath) -> List[str]:
+        prefix = PurePath(directory).as_posix().rstrip("/") + "/"
+        return sorted(key[len(prefix):] for key in list(self.files) if key.startswith(prefix) and "/" not in key[len(prefix):])
+
+    def exists(self, path: PurePath) -> bool:
+        return PurePath(path).as_posix() in self.files
+
+    def open(self, path: PurePath, size: int = None) -> _MemoryFile:
+        return _MemoryFile(self, path)
+
+    def read(self, path: PurePath) -> bytes:
+        """
+        Returns the content of `path`
+        """
+        return self.files[PurePath(path).as_posix()]
+
+
+class _MultipartUpload():
+    """
+    A file of `S3Storage`, uploaded in parts of `partSize` bytes while it is downloaded
+    Files smaller than one part are uploaded with a single `put_object`
+    """
+
+    def __init__(self, storage: "S3Storage", path: PurePath, key: str):
+        self.storage = storage
+        self.path = path
+        self.key = key
+        self.buffer = bytearray()
+        self.uploadId = None
+        self.parts: List[Future] = []
+
+    def write(self, data: bytes):
+        self.buffer += data
+        while(len(self.buffer) >= self.storage.partSize):
+            part = bytes(self.buffer[:self.storage.partSize])
+            del self.buffer[:self.storage.partSize]
+            self.__upload(part)
+
+    def __upload(self, part: bytes):
+        client = self.storage.client
+        if(self.uploadId is None):
+            self.uploadId = client.create_multipart_upload(
+                Bucket=self.storage.bucket, Key=self.key)["UploadId"]
+        self.parts.append(self.storage._submit(client.upload_part, Bucket=self.storage.bucket, Key=self.key,
+                                               UploadId=self.uploadId, PartNumber=len(self.parts) + 1, Body=part))
+
+    def close(self) -> Future:
+        """
+        Uploads the last part and completes the upload, blocks until every part is uploaded
+        """
+        client = self.storage.client
+        future = Future()
+        try:
+            if(self.uploadId is None):
+                client.put_object(Bucket=self.storage.bucket,
+                                  Key=self.key, Body=bytes(self.buffer))
+            else:
+                if(self.buffer):
+                    self.__upload(bytes(self.buffer))
+                parts = [{"ETag": part.result()["ETag"], "PartNumber": i + 1}
+                         for i, part in enumerate(self.parts)]
+                client.complete_multipart_upload(Bucket=self.storage.bucket, Key=self.key, UploadId=self.uploadId,
+                                                 MultipartUpload={"Parts": parts})
+            future.set_result(self.path)
+        except Exception as e:
+            self.abort(e)
+            future.set_exception(e)
+        self.buffer = None
+        return future
+
+    def abort(self, error: Exception = None):
+        self.buffer = None
+        if(self.uploadId is not None):
+            for part in self.parts:
+                part.exception()
+            self.storage.client.abort_multipart_upload(
+                Bucket=self.storage.bucket, Key=self.key, UploadId=self.uploadId)
+            self.uploadId = None
+
+
+class S3Storage(Storage):
+    """
+    Streams the files to an S3 compatible bucket with multipart uploads, without writing them to the local disk
+
+    `client` is a boto3 S3 client or any object with the same `put_object`, `create_multipart_upload`, `upload_part`,
+    `complete_multipart_upload`, `abort_multipart_upload` and `list_objects_v2` methods.
+    Without `client` a boto3 client is created with `clientOptions` (`endpoint_url`, ...), boto3 is then required.
+    Keys are the posix form of the paths prefixed with `prefix`.
+    At most `concurrency` parts of `partSize` bytes are uploaded at once, `write` blocks beyond that
+    """
+
+    def __init__(self, bucket: str, client=None, prefix: str = "", partSize: int = 8 << 20, concurrency: int = 4, **clientOptions):
+        if(client is None):
+            import boto3
+            client = boto3.client("s3", **clientOptions)
+        if(partSize < 5 << 20):
+            raise ValueError("S3 parts must be at least 5 MiB")
+        self.bucket = bucket
+        self.client = client
+        self.prefix = prefix
+        self.partSize = partSize
+        self.__slots = threading.BoundedSemaphore(concurrency)
+        self.__executor = ThreadPoolExecutor(
+            concurrency, thread_name_prefix="S3Storage")
+
+    def key(self, path: PurePath) -> str:
+        """
+        Returns the object key of `path`
+        """
+        return self.prefix + PurePath(path).as_posix().lstrip("/")
+
+    def _submit(self, fn, **kwargs) -> Future:
+        self.__slots.acquire()
+        future = self.__executor.submit(fn, **kwargs)
+        future.add_done_callback(lambda _: self.__slots.release())
+        return future
+
+    def find(self, directory: PurePath) -> List[str]:
+        prefix = self.key(directory).rstrip("/") + "/"
+        names = []
+        kwargs = {"Bucket": self.bucket, "Prefix": prefix, "Delimiter": "/"}
+        while(True):
+            response = self.client.list_objects_v2(**kwargs)
+            names.extend(obj["Key"][len(prefix):]
+                         for obj in response.get("Contents", ()))
+            if(not response.get("IsTruncated")):
+                return sorted(names)
+            kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+    def open(self, path: PurePath, size: int = None) -> _MultipartUpload:
+        return _MultipartUpload(self, path, self.key(path))
+
+    def close(self):
+        """
+        Waits for the uploads and shuts the upload threads down
+        """
+        self.__executor.shutdown()
+
+    def __enter__(self) -> "S3Storage":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,186 @@
+import base64
+import gzip
+import hashlib
+import io
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Union
+
+from requests import PreparedRequest
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+class CassetteMiss(Exception):
+    pass
+
+
+class Cassette():
+    """
+    Recorded HTTP exchanges stored as a gzip compressed json lines file
+
+    Exchanges are indexed by method, url and body, identical requests are replayed
+    in the order they were recorded
+    """
+
+    def __init__(self, path: Union[Path, str] = None):
+        self.path = Path(path) if path else None
+        self.__exchanges: Dict[str, List[dict]] = {}
+        self.__played: Dict[str, int] = {}
+        self.__lock = threading.Lock()
+        if(self.path and self.path.exists()):
+            self.load()
+
+    @staticmethod
+    def key(method: str, url: str, body: Union[bytes, str] = None) -> str:
+        """
+        Returns the index key of a request
+        """
+        if(isinstance(body, str)):
+            body = body.encode("utf-8")
+        return hashlib.sha1(b"\0".join((method.upper().encode("utf-8"), url.encode("utf-8"), body or b""))).hexdigest()
+
+    def __len__(self) -> int:
+        return sum(len(exchanges) for exchanges in self.__exchanges.values())
+
+    def record(self, request: PreparedRequest, response: Response):
+        """
+        Records an exchange, the response's content is read
+        The content is stored decoded, so its encoding headers are dropped
+        """
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in (
+            "content-encoding", "transfer-encoding", "content-length")}
+        headers["Content-Length"] = str(len(response.content))
+        exchange = {"method": request.method, "url": request.url, "status": response.status_code,
+                    "reason": response.reason, "headers": headers,
+                    "content": base64.b64encode(response.content).decode("ascii")}
+        with self.__lock:
+            self.__exchanges.setdefault(self.key(
+                request.method, request.url, request.body), []).append(exchange)
+
+    def play(self, request: PreparedRequest) -> dict:
+        """
+        Returns the next recorded exchange matching `request`, the last one is repeated once they ran out
+        Raises `CassetteMiss` if the request was never recorded
+        """
+        key = self.key(request.method, request.url, request.body)
+        with self.__lock:
+            exchanges = self.__exchanges.get(key)
+            if(not exchanges):
+                raise CassetteMiss(f"{request.method} {request.url}")
+            played = self.__played.get(key, 0)
+            self.__played[key] = played + 1
+        return exchanges[min(played, len(exchanges) - 1)]
+
+    def rewind(self):
+        """
+        Replays every exchange from the start again
+        """
+        with self.__lock:
+            self.__played.clear()
+
+    def load(self, path: Union[Path, str] = None):
+        """
+        Loads the exchanges of the cassette file
+        """
+        path = Path(path) if path else self.path
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                key, exchange = json.loads(line)
+                self.__exchanges.setdefault(key, []).append(exchange)
+
+    def save(self, path: Union[Path, str] = None):
+        """
+        Writes the exchanges to the cassette file
+        """
+        path = Path(path) if path else self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self.__lock, gzip.open(path, "wt", encoding="utf-8") as f:
+            for key, exchanges in self.__exchanges.items():
+                for exchange in exchanges:
+                    f.write(json.dumps([key, exchange], separators=(",", ":")))
+                    f.write("\n")
+
+
+class RecordingAdapter(BaseAdapter):
+    """
+    A transport adapter sending requests through `adapter` and recording every exchange to `cassette`
+    Mount it on a `RequestHandler.session` wrapping the adapter already mounted there, which keeps the handler's retries,
+    the cassette is saved when the adapter is closed
+    """
+
+    def __init__(self, cassette: Cassette, adapter: BaseAdapter):
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        response = self.adapter.send(request, **kwargs)
+        self.cassette.record(request, response)
+        return response
+
+    def close(self):
+        self.adapter.close()
+        if(self.cassette.path):
+            self.cassette.save()
+
+
+class _ThrottledReader(io.RawIOBase):
+    """
+    Reads `content` no faster than `bandwidth` bytes per second
+    """
+
+    def __init__(self, content: bytes, bandwidth: float = None):
+        self.__content = io.BytesIO(content)
+        self.__bandwidth = bandwidth
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        read = self.__content.readinto(buffer)
+        if(self.__bandwidth and read):
+            time.sleep(read / self.__bandwidth)
+        return read
+
+    def release_conn(self):
+        pass
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    A transport adapter answering requests from `cassette` without using the network
+
+    `latency` is the simulated delay in seconds before every response
+    `bandwidth` is the simulated transfer rate of the response content in bytes per second, None for no limit
+    Mount it on a `RequestHandler.session`
+    """
+
+    def __init__(self, cassette: Cassette, latency: float = 0, bandwidth: float = None):
+        super().__init__()
+        self.cassette = cassette
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        exchange = self.cassette.play(request)
+        if(self.latency):
+            time.sleep(self.latency)
+        response = Response()
+        response.status_code = exchange["status"]
+        response.reason = exchange["reason"]
+        response.headers = CaseInsensitiveDict(exchange["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = _ThrottledReader(base64.b64decode(
+            exchange["content"]), self.bandwidth)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
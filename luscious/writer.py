@@ -0,0 +1,260 @@
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Iterable, List, Union
+
+_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+class PendingFile():
+    """
+    A file being written by a `DiskWriter`, returned by `DiskWriter.open`
+
+    `write` copies the data into the writer's buffers and only blocks when all of them are in use,
+    `future` resolves to the path once the file is written and closed
+    """
+    __slots__ = ("writer", "path", "size", "future",
+                 "written", "error", "__buffer", "__length")
+
+    def __init__(self, writer: "DiskWriter", path: Path, size: int = None):
+        self.writer = writer
+        self.path = path
+        self.size = size
+        self.future = Future()
+        # updated by the writer thread
+        self.written = 0
+        self.error = None
+        self.__buffer = None
+        self.__length = 0
+
+    def write(self, data: bytes):
+        """
+        Queues `data` to be written to the file
+        """
+        view = memoryview(data)
+        while(view):
+            if(self.__buffer is None):
+                self.__buffer = self.writer._acquire()
+                self.__length = 0
+            n = min(len(self.__buffer) - self.__length, len(view))
+            self.__buffer[self.__length:self.__length + n] = view[:n]
+            self.__length += n
+            view = view[n:]
+            if(self.__length == len(self.__buffer)):
+                self.__flush()
+
+    def __flush(self):
+        if(self.__buffer is not None):
+            self.writer._submit(("write", self, self.__buffer, self.__length))
+            self.__buffer = None
+
+    def close(self) -> Future:
+        """
+        Queues the remaining data and the closing of the file
+        Returns `future`, which raises the `OSError` of the writer thread if the file couldn't be written
+        """
+        self.__flush()
+        self.writer._submit(("close", self))
+        return self.future
+
+    def abort(self, error: Exception = None):
+        """
+        Drops the queued data and deletes the file
+        """
+        if(self.__buffer is not None):
+            self.writer._release(self.__buffer)
+            self.__buffer = None
+        self.writer._submit(("abort", self, error))
+
+
+class DiskWriter():
+    """
+    Writes downloaded files on a dedicated thread so slow disks don't stall the connections
+
+    Downloads copy their chunks into `buffers` reusable buffers of `bufferSize` bytes, which bounds the memory used.
+    Full buffers are written in large writes, consecutive buffers of the same file are written with a single `os.writev`.
+    Files are preallocated from their expected size when `preallocate` is True and `os.posix_fallocate` exists.
+    With `fsync` the downloads call `sync` once they are done to flush all their files at once
+
+    Pass it to `Album.downloadContent` or `Video.downloadContent`, one writer can be shared by several downloads.
+    Use it as a context manager or call `close` to stop the thread
+    """
+
+    def __init__(self, buffers: int = 32, bufferSize: int = 1 << 20, preallocate: bool = True, fsync: bool = False):
+        self.bufferSize = bufferSize
+        self.buffers = buffers
+        self.preallocate = preallocate and hasattr(os, "posix_fallocate")
+        self.fsync = fsync
+        self.__pool = queue.LifoQueue()
+        self.__allocated = 0
+        self.__allocLock = threading.Lock()
+        self.__ops = queue.Queue()
+        self.__files = {}
+        self.__thread = threading.Thread(
+            target=self.__run, name="DiskWriter", daemon=True)
+        self.__thread.start()
+
+    def open(self, path: Union[Path, str], size: int = None) -> PendingFile:
+        """
+        Queues the creation of `path`, `size` is the expected size of the file if known
+        """
+        pending = PendingFile(self, Path(path), size or None)
+        self._submit(("open", pending))
+        return pending
+
+    def sync(self, paths: Iterable[Union[Path, str]]) -> Future:
+        """
+        Queues the fsync of `paths` and of their directories, after the writes queued before it
+        Returns a `Future` resolving once they are on disk
+        """
+        future = Future()
+        self._submit(("sync", [Path(p) for p in paths], future))
+        return future
+
+    def close(self):
+        """
+        Waits for the queued writes and stops the writer thread
+        """
+        if(self.__thread.is_alive()):
+            self._submit(("stop",))
+            self.__thread.join()
+
+    def __enter__(self) -> "DiskWriter":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _acquire(self) -> bytearray:
+        try:
+            return self.__pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self.__allocLock:
+            if(self.__allocated < self.buffers):
+                self.__allocated += 1
+                return bytearray(self.bufferSize)
+        return self.__pool.get()
+
+    def _release(self, buffer: bytearray):
+        self.__pool.put(buffer)
+
+    def _submit(self, op: tuple):
+        self.__ops.put(op)
+
+    def __run(self):
+        op = None
+        while(True):
+            if(op is None):
+                op = self.__ops.get()
+            kind = op[0]
+            if(kind == "stop"):
+                return
+            if(kind == "write"):
+                # coalesce the following writes of the same file
+                writes = [op]
+                op = None
+                while(len(writes) < 64):
+                    try:
+                        op = self.__ops.get_nowait()
+                    except queue.Empty:
+                        op = None
+                        break
+                    if(op[0] != "write" or op[1] is not writes[0][1]):
+                        break
+                    writes.append(op)
+                    op = None
+                self.__write(writes)
+                continue
+            if(kind == "open"):
+                self.__open(op[1])
+            elif(kind == "close"):
+                self.__close(op[1])
+            elif(kind == "abort"):
+                self.__close(op[1], op[2] or OSError("download aborted"))
+            elif(kind == "sync"):
+                self.__sync(op[1], op[2])
+            op = None
+
+    def __open(self, pending: PendingFile):
+        try:
+            fd = os.open(pending.path, _FLAGS, 0o666)
+        except OSError as e:
+            pending.error = e
+            return
+        self.__files[pending] = fd
+        if(self.preallocate and pending.size):
+            try:
+                os.posix_fallocate(fd, 0, pending.size)
+            except OSError:
+                pass
+
+    def __write(self, writes: List[tuple]):
+        pending = writes[0][1]
+        views = [memoryview(buffer)[:length] for _, _, buffer, length in writes]
+        try:
+            fd = self.__files.get(pending)
+            if(fd is not None and pending.error is None):
+                while(views):
+                    if(hasattr(os, "writev")):
+                        n = os.writev(fd, views)
+                    else:
+                        n = os.write(fd, views[0])
+                    pending.written += n
+                    while(views and n >= len(views[0])):
+                        n -= len(views.pop(0))
+                    if(n):
+                        views[0] = views[0][n:]
+        except OSError as e:
+            pending.error = e
+        finally:
+            views.clear()
+            for _, _, buffer, _ in writes:
+                self._release(buffer)
+
+    def __close(self, pending: PendingFile, error: Exception = None):
+        fd = self.__files.pop(pending, None)
+        error = error or pending.error
+        if(fd is not None):
+            try:
+                # drop the unused end of a preallocated file
+                if(self.preallocate and pending.size and pending.written != pending.size):
+                    os.ftruncate(fd, pending.written)
+            except OSError as e:
+                error = error or e
+            finally:
+                os.close(fd)
+        if(error):
+            try:
+                os.unlink(pending.path)
+            except OSError:
+                pass
+            pending.future.set_exception(error)
+        else:
+            pending.future.set_result(pending.path)
+
+    def __sync(self, paths: List[Path], future: Future):
+        try:
+            for path in paths:
+                fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            for directory in {path.parent for path in paths}:
+                try:
+                    fd = os.open(directory, os.O_RDONLY)
+                except OSError:
+                    # directories can't be opened on windows
+                    continue
+                try:
+                    os.fsync(fd)
+                except OSError:
+                    pass
+                finally:
+                    os.close(fd)
+            future.set_result(len(paths))
+        except OSError as e:
+            future.set_exception(e)